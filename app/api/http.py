@@ -0,0 +1,58 @@
+import httpx
+from typing import Optional
+from functools import lru_cache
+from app.config import Settings, get_settings
+
+
+def http2_available() -> bool:
+    """check whether the optional h2 package is installed"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClientPool:
+    """process-wide pooled http client shared by all outbound calls"""
+
+    def __init__(self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """initialize with application settings and optional custom transport"""
+        self.settings = settings
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """get shared client, creating it lazily on first use"""
+        # httpx keeps a separate keep-alive pool per origin inside one client,
+        # so auth, api and image cdn hosts each reuse their own warm connections
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """build client with configured pool limits"""
+        limits = httpx.Limits(
+            max_connections=self.settings.http_max_connections,
+            max_keepalive_connections=self.settings.http_max_keepalive,
+            keepalive_expiry=self.settings.http_keepalive_expiry
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=self.settings.http2 and http2_available(),
+            timeout=self.settings.http_timeout,
+            transport=self.transport
+        )
+
+    async def aclose(self) -> None:
+        """close pooled connections on shutdown"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+@lru_cache
+def get_http_pool() -> HttpClientPool:
+    """provide process-wide http client pool"""
+    return HttpClientPool(get_settings())
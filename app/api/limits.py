@@ -0,0 +1,180 @@
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, Optional, Union
+from app.config import get_settings
+
+# seconds to back off when a 429 carries no usable retry-after
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class UpstreamUnavailable(Exception):
+    """raised when spotify is throttling, failing or being guarded against"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TokenBucket:
+    """token bucket limiter, refilled continuously at a fixed rate"""
+
+    def __init__(self, rate: float, burst: int):
+        """initialize with refill rate per second and bucket capacity (rate 0 disables)"""
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        """take one token if available without waiting"""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """opens after consecutive failures, then lets one trial call through after a cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """initialize with failures needed to open and seconds to stay open"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """current breaker state"""
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """whether a call may go out now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """close the breaker"""
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """count a failure, returning whether this opened the breaker"""
+        was_closed = self.failures < self.failure_threshold
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            # a failed trial restarts the cooldown
+            self._opened_at = time.monotonic()
+            return was_closed
+        return False
+
+    def release(self) -> None:
+        """give back a trial slot whose call never completed"""
+        self._trial_in_flight = False
+
+
+class UpstreamGuard:
+    """rate limiting, retry-after and circuit breaking shared by every spotify api client"""
+
+    def __init__(self, bucket: TokenBucket, breaker: CircuitBreaker):
+        """initialize with limiter and breaker"""
+        self.bucket = bucket
+        self.breaker = breaker
+        self.blocked_until = 0.0
+        self.counts: Counter = Counter()
+
+    def check(self) -> None:
+        """reserve an outbound call or raise why it may not go out"""
+        if time.monotonic() < self.blocked_until:
+            self.counts["retry_after_skipped"] += 1
+            raise UpstreamUnavailable("retry-after")
+        # the breaker goes first, so calls it rejects never spend rate limit tokens
+        if not self.breaker.allow():
+            self.counts["circuit_rejected"] += 1
+            raise UpstreamUnavailable("circuit-open")
+        if not self.bucket.try_acquire():
+            # a half-open trial that never goes out must not hold the slot
+            self.breaker.release()
+            self.counts["throttled"] += 1
+            raise UpstreamUnavailable("throttled")
+        self.counts["allowed"] += 1
+
+    def record_response(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """feed a response status into retry-after and breaker state"""
+        if status_code == 429:
+            self.counts["rate_limited"] += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + parse_retry_after(retry_after))
+            # throttling is not an outage, but the trial slot must be freed
+            self.breaker.release()
+        elif status_code >= 500:
+            self._record_failure()
+        else:
+            self.breaker.record_success()
+
+    def record_error(self) -> None:
+        """count a transport error as an upstream failure"""
+        self._record_failure()
+
+    def record_abandoned(self) -> None:
+        """release state held by a call that was cancelled mid-flight"""
+        self.breaker.release()
+
+    def _record_failure(self) -> None:
+        """count failure and note breaker transitions"""
+        self.counts["failures"] += 1
+        if self.breaker.record_failure():
+            self.counts["circuit_opened"] += 1
+
+    def stats(self) -> Dict[str, Union[int, float, str]]:
+        """get guard counters and current state"""
+        return {
+            **self.counts,
+            "circuit_state": self.breaker.state,
+            "retry_after_remaining": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """parse retry-after header given as seconds or an http date"""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+@lru_cache
+def get_upstream_guard() -> UpstreamGuard:
+    """provide process-wide upstream guard"""
+    settings = get_settings()
+    return UpstreamGuard(
+        TokenBucket(settings.spotify_rate_limit, settings.spotify_rate_burst),
+        CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_timeout)
+    )
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+from functools import lru_cache
+from app.config import get_settings
+from app.api.spotify import SpotifyApiClient, get_spotify_client
+from app.domain.models import Track
+
+logger = logging.getLogger(__name__)
+
+
+def track_identity(track: Optional[Track]) -> Optional[Tuple[str, str, str]]:
+    """fields whose change counts as a new now-playing state"""
+    return (track["id"], track["name"], track["artist"]) if track else None
+
+
+class NowPlayingPoller:
+    """keeps an in-memory snapshot of the now-playing track fresh in the background"""
+
+    def __init__(self, client: SpotifyApiClient, interval: float, max_age: Optional[float] = None):
+        """initialize with api client, poll interval and snapshot max age in seconds"""
+        self.client = client
+        self.interval = interval
+        # tolerate a few missed polls before treating the snapshot as stale
+        self.max_age = max_age if max_age is not None else interval * 3
+        self._snapshot: Optional[Track] = None
+        self._updated_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+        # serializes inline refreshes while no fresh snapshot exists
+        self._lock = asyncio.Lock()
+        # bumped on every track change, watchers wait on the event and it is replaced after firing
+        self._version = 0
+        self._changed = asyncio.Event()
+        # polling on behalf of watchers while the background loop is off
+        self._watchers = 0
+        self._watch_task: Optional[asyncio.Task] = None
+        # set once the poller is dropped for good, watchers then end their streams
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        """whether background polling is configured"""
+        return self.interval > 0
+
+    @property
+    def snapshot(self) -> Optional[Track]:
+        """latest polled track, if any"""
+        return self._snapshot
+
+    @property
+    def closed(self) -> bool:
+        """whether the poller was closed and no longer polls"""
+        return self._closed
+
+    @property
+    def version(self) -> int:
+        """counter of now-playing changes seen so far"""
+        return self._version
+
+    @property
+    def is_fresh(self) -> bool:
+        """whether snapshot exists and the poll loop is still keeping it current"""
+        return self._snapshot is not None and time.time() - self._updated_at < self.max_age
+
+    async def get_current_track(self) -> Track:
+        """get now-playing track from snapshot, fetching inline only when needed"""
+        if not self.enabled:
+            return await self.client.get_current_track()
+
+        if self.is_fresh:
+            return self._snapshot
+
+        # first request or stalled poll loop, refresh once for all waiters
+        async with self._lock:
+            if not self.is_fresh:
+                await self.refresh()
+        return self._snapshot
+
+    async def refresh(self) -> Track:
+        """fetch track from spotify and replace the snapshot"""
+        track = await self.client.get_current_track()
+        changed = track_identity(track) != track_identity(self._snapshot)
+        self._snapshot = track
+        self._updated_at = time.time()
+        if changed:
+            # one event wakes every watcher, however many are connected
+            self._version += 1
+            self._changed.set()
+            self._changed = asyncio.Event()
+        return track
+
+    async def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """wait until the track changes past version or timeout passes, returning the current version"""
+        if self._version == version and not self._closed:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._version
+
+    @asynccontextmanager
+    async def watching(self, interval: float) -> AsyncIterator[None]:
+        """keep the snapshot polled while at least one watcher is connected"""
+        self._watchers += 1
+        if self._task is None and self._watch_task is None and not self._closed:
+            # started from a request, but must not record into that request's stage timings
+            self._watch_task = contextvars.Context().run(asyncio.create_task, self._run(interval))
+        try:
+            yield
+        finally:
+            self._watchers -= 1
+            if self._watchers == 0 and self._watch_task is not None:
+                self._watch_task.cancel()
+                self._watch_task = None
+
+    def start(self) -> None:
+        """start background poll loop if enabled"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(self.interval))
+
+    async def stop(self) -> None:
+        """cancel background and watcher poll loops"""
+        for task in (self._task, self._watch_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._watch_task = None
+
+    def close(self) -> None:
+        """stop polling for good and wake watchers, safe to call from any thread"""
+        self._closed = True
+        task = self._task or self._watch_task
+        if task is not None:
+            task.get_loop().call_soon_threadsafe(self._release)
+
+    def _release(self) -> None:
+        """cancel poll loops of a closed poller and wake its watchers"""
+        for task in (self._task, self._watch_task):
+            if task is not None:
+                task.cancel()
+        self._task = self._watch_task = None
+        self._changed.set()
+
+    async def _run(self, interval: float) -> None:
+        """poll spotify on a fixed interval until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # keep serving the previous snapshot on unexpected errors
+                logger.exception("now-playing poll failed")
+            await asyncio.sleep(interval)
+
+
+@lru_cache
+def get_poller() -> NowPlayingPoller:
+    """provide app-scoped now-playing poller"""
+    return NowPlayingPoller(get_spotify_client(), get_settings().poll_interval)
@@ -1,154 +1,352 @@
+import asyncio
+import json
+import logging
+import os
+import time
 import httpx
-from typing import Dict, Any, Optional
-from app.config import Settings
-from app.utils.base64 import Base64Encoder
-from app.domain.models import Track, ThemeStyle
+from typing import Callable, Dict, Any, Optional
+from functools import lru_cache
+from app.config import Settings, get_settings
+from app.api.http import HttpClientPool, get_http_pool
+from app.api.limits import UpstreamGuard, UpstreamUnavailable, get_upstream_guard
+from app.utils.base64 import Base64Encoder, get_encoder
+from app.utils.images import DEFAULT_ART_SIZE
+from app.utils.metrics import SPOTIFY_SECONDS
+from app.utils.timing import timed
+from app.domain.models import AlbumImage, Track, ThemeStyle
+
+logger = logging.getLogger(__name__)
 
 
 class SpotifyAuthClient:
-    """handles spotify api authentication"""
+    """handles spotify api authentication with expiry-aware token caching"""
     
-    def __init__(self, settings: Settings):
-        """initialize with application settings"""
+    def __init__(self, settings: Settings, http: HttpClientPool,
+                 on_refresh_token_rotated: Optional[Callable[[str], None]] = None):
+        """initialize with application settings, shared http pool and optional rotation hook"""
         self.settings = settings
+        self.http = http
+        self.on_refresh_token_rotated = on_refresh_token_rotated
         self._token: Optional[str] = None
+        self._expires_at: float = 0.0
+        self._refresh_token = settings.refresh_token
+        # cached token reuse versus refresh round trips
+        self.hits = 0
+        self.misses = 0
+        # serializes refreshes so concurrent requests share one round trip
+        self._lock = asyncio.Lock()
+        self._load_cached_token()
+        
+    @property
+    def has_valid_token(self) -> bool:
+        """whether cached token is present and not about to expire"""
+        return bool(self._token) and time.time() < self._expires_at - self.settings.token_refresh_margin
         
     async def get_token(self) -> str:
         """get access token using refresh token flow"""
-        # return cached token if available
-        if self._token:
+        # return cached token if still fresh
+        if self.has_valid_token:
+            self.hits += 1
             return self._token
             
-        # request new token
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.settings.auth_api_url,
-                    data={
-                        "grant_type": "refresh_token",
-                        "refresh_token": self.settings.refresh_token,
-                        "client_id": self.settings.client_id,
-                        "client_secret": self.settings.client_secret,
-                    },
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    self._token = data["access_token"]
-                    return self._token
-            except (httpx.RequestError, httpx.TimeoutException):
-                pass
-                
+        async with self._lock:
+            # another request may have refreshed while we were waiting
+            if self.has_valid_token:
+                self.hits += 1
+                return self._token
+            self.misses += 1
+            return await self._refresh()
+            
+    def invalidate(self, token: str) -> None:
+        """drop cached token after the api rejected it"""
+        # only clear if nobody has refreshed it in the meantime
+        if token and token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+            
+    async def _refresh(self) -> str:
+        """request new access token from auth api"""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.http.client.post(
+                self.settings.auth_api_url,
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": self._refresh_token,
+                    "client_id": self.settings.client_id,
+                    "client_secret": self.settings.client_secret,
+                },
+                timeout=self.settings.spotify_timeout
+            )
+            status = str(response.status_code)
+            
+            if response.status_code == 200:
+                data = response.json()
+                self._token = data["access_token"]
+                self._expires_at = time.time() + float(data.get("expires_in", 3600))
+                # spotify may rotate the refresh token
+                rotated = data.get("refresh_token")
+                if rotated and rotated != self._refresh_token:
+                    self._refresh_token = rotated
+                    if self.on_refresh_token_rotated:
+                        self.on_refresh_token_rotated(rotated)
+                self._save_cached_token()
+                return self._token
+        except (httpx.RequestError, httpx.TimeoutException, ValueError, KeyError):
+            pass
+        finally:
+            SPOTIFY_SECONDS.observe(time.perf_counter() - start, "token", status)
+            
         # fallback to empty token
         return ""
+        
+    def _load_cached_token(self) -> None:
+        """restore token state persisted by a previous process"""
+        path = self.settings.token_cache_path
+        if not path:
+            return
+            
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, IOError, ValueError):
+            return
+            
+        # ignore state saved for a different configured refresh token
+        if data.get("source_refresh_token") != self.settings.refresh_token:
+            return
+            
+        self._token = data.get("access_token") or None
+        self._expires_at = float(data.get("expires_at", 0.0))
+        self._refresh_token = data.get("refresh_token") or self._refresh_token
+        
+    def _save_cached_token(self) -> None:
+        """persist token state so cold starts can skip the auth round trip"""
+        path = self.settings.token_cache_path
+        if not path:
+            return
+            
+        data = {
+            "access_token": self._token,
+            "expires_at": self._expires_at,
+            "refresh_token": self._refresh_token,
+            "source_refresh_token": self.settings.refresh_token,
+        }
+        
+        # write atomically so a crash never leaves a truncated file
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        except (IOError, OSError):
+            pass
 
 
 class SpotifyApiClient:
     """handles spotify api data access"""
     
-    def __init__(self, auth_client: SpotifyAuthClient, settings: Settings, encoder: Base64Encoder):
+    def __init__(self, auth_client: SpotifyAuthClient, settings: Settings, encoder: Base64Encoder,
+                 http: HttpClientPool, guard: UpstreamGuard):
         """initialize with required dependencies"""
         self.auth_client = auth_client
         self.settings = settings
         self.encoder = encoder
-        self.timeout = 5.0  # request timeout in seconds
+        self.http = http
+        self.guard = guard
+        # served instead of the default track while spotify is unavailable
+        self._last_track: Optional[Track] = None
         
     async def get_current_track(self) -> Track:
         """get user's currently playing or recently played track"""
-        token = await self.auth_client.get_token()
+        with timed("token"):
+            token = await self.auth_client.get_token()
         if not token:
-            return self._get_default_track()
+            return self._get_fallback_track()
             
-        headers = {"Authorization": f"Bearer {token}"}
-        
-        # try current track first, then fall back to recent
-        current = await self._fetch_current_track(headers)
+        try:
+            # one token lookup per fetch, shared by the current and recent requests
+            if self.settings.fetch_strategy == "parallel":
+                track = await self._get_track_parallel(token)
+            else:
+                track = await self._get_track_serial(token)
+        except UpstreamUnavailable:
+            # throttled or failing is not the same as nothing playing
+            return self._get_fallback_track()
+            
+        if track:
+            self._last_track = track
+            
+        # final fallback
+        return track or self._get_default_track()
+    
+    async def _get_track_serial(self, token: str) -> Optional[Track]:
+        """try current track first, then fall back to recent"""
+        current = await self._fetch_current_item(token)
         if current:
-            return current
+            return await self._process_track(current)
             
-        recent = await self._fetch_recent_track(headers)
+        recent = await self._fetch_recent_item(token)
         if recent:
-            return recent
+            return await self._process_track(recent)
             
-        # final fallback
-        return self._get_default_track()
+        return None
     
-    async def _fetch_current_track(self, headers: Dict[str, str]) -> Optional[Track]:
-        """fetch currently playing track from api"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.settings.spotify_api_url}/me/player/currently-playing",
-                    headers=headers,
-                    timeout=self.timeout
-                )
+    async def _get_track_parallel(self, token: str) -> Optional[Track]:
+        """request current and recent concurrently, current still takes precedence"""
+        current_task = asyncio.create_task(self._fetch_current_item(token))
+        recent_task = asyncio.create_task(self._fetch_recent_item(token))
+        recent_track_task: Optional[asyncio.Task] = None
+        
+        try:
+            done, _ = await asyncio.wait({current_task, recent_task}, return_when=asyncio.FIRST_COMPLETED)
+            
+            # recent answered first, start its cover download while current is pending
+            if current_task not in done and recent_task.exception() is None and recent_task.result():
+                recent_track_task = asyncio.create_task(self._process_track(recent_task.result()))
+                
+            current = await current_task
+            if current:
+                return await self._process_track(current)
                 
-                if response.status_code == 200 and response.content:
-                    data = response.json()
-                    if data.get('item'):
-                        return await self._process_track(data['item'])
-            except (httpx.RequestError, httpx.TimeoutException, ValueError):
-                pass
+            recent = await recent_task
+            if recent:
+                return await (recent_track_task or self._process_track(recent))
                 
+            return None
+        finally:
+            # drop speculative work the winner made unnecessary
+            for task in (current_task, recent_task, recent_track_task):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def _api_get(self, path: str, token: str) -> httpx.Response:
+        """get api resource, refreshing the token once if it was rejected"""
+        response = await self._guarded_get(path, token)
+        
+        # token revoked or expired early, retry once with a fresh one
+        if response.status_code == 401:
+            self.auth_client.invalidate(token)
+            token = await self.auth_client.get_token()
+            if token:
+                response = await self._guarded_get(path, token)
+                
+        return response
+    
+    async def _guarded_get(self, path: str, token: str) -> httpx.Response:
+        """send one api request through the upstream guard"""
+        self.guard.check()
+        route = path.partition("?")[0]
+        start = time.perf_counter()
+        try:
+            response = await self.http.client.get(
+                f"{self.settings.spotify_api_url}{path}",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.settings.spotify_timeout
+            )
+        except (httpx.RequestError, httpx.TimeoutException) as e:
+            SPOTIFY_SECONDS.observe(time.perf_counter() - start, route, "error")
+            self.guard.record_error()
+            raise UpstreamUnavailable("request-error") from e
+        except asyncio.CancelledError:
+            self.guard.record_abandoned()
+            raise
+            
+        SPOTIFY_SECONDS.observe(time.perf_counter() - start, route, str(response.status_code))
+        self.guard.record_response(response.status_code, response.headers.get("retry-after"))
+        if response.status_code == 429 or response.status_code >= 500:
+            raise UpstreamUnavailable(f"status-{response.status_code}")
+        return response
+    
+    async def _fetch_current_item(self, token: str) -> Optional[Dict[str, Any]]:
+        """fetch currently playing track item from api"""
+        try:
+            with timed("current-track"):
+                response = await self._api_get("/me/player/currently-playing", token)
+            
+            if response.status_code == 200 and response.content:
+                data = response.json()
+                if data.get('item'):
+                    return data['item']
+        except (httpx.RequestError, httpx.TimeoutException, ValueError):
+            pass
+            
         return None
         
-    async def _fetch_recent_track(self, headers: Dict[str, str]) -> Optional[Track]:
-        """fetch recently played track from api, ensuring we get the most recent by timestamp"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.settings.spotify_api_url}/me/player/recently-played?limit=10",
-                    headers=headers,
-                    timeout=self.timeout
-                )
+    async def _fetch_recent_item(self, token: str) -> Optional[Dict[str, Any]]:
+        """fetch recently played track item from api, ensuring we get the most recent by timestamp"""
+        try:
+            with timed("recent-track"):
+                response = await self._api_get("/me/player/recently-played?limit=10", token)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('items') and len(data['items']) > 0:
+                    sorted_items = sorted(
+                        data['items'], 
+                        key=lambda item: item.get('played_at', ''), 
+                        reverse=True 
+                    )
+                    return sorted_items[0]['track']
+            logger.warning("recent track unavailable", extra={"status": response.status_code})
+        except (httpx.RequestError, httpx.TimeoutException, ValueError) as e:
+            logger.warning("recent track fetch failed", extra={"error": str(e)})
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('items') and len(data['items']) > 0:
-                        sorted_items = sorted(
-                            data['items'], 
-                            key=lambda item: item.get('played_at', ''), 
-                            reverse=True 
-                        )
-                        return await self._process_track(sorted_items[0]['track'])
-                print(f"Failed to fetch recent track, status: {response.status_code}")
-            except (httpx.RequestError, httpx.TimeoutException, ValueError) as e:
-                print(f"Error fetching recent track: {str(e)}")
-                pass
-                    
         return None
     
     async def _process_track(self, track_data: Dict[str, Any]) -> Track:
         """process api track data into domain model"""
-        # extract album image url
-        album_image_url = ""
-        if (track_data.get('album') and 
-                track_data['album'].get('images') and 
-                len(track_data['album']['images']) > 0):
-            # prefer medium size image
-            album_image_url = (track_data['album']['images'][1]['url'] 
-                              if len(track_data['album']['images']) > 1 
-                              else track_data['album']['images'][0]['url'])
+        # collect album image sources, the pipeline picks the best fit per theme
+        album_images = [
+            AlbumImage(url=image['url'], width=image.get('width'), height=image.get('height'))
+            for image in (track_data.get('album') or {}).get('images') or []
+            if image.get('url')
+        ]
         
-        # get base64 encoded image
-        album_image = await self.encoder.encode_url(album_image_url) if album_image_url else self.encoder.get_default_image()
+        # get base64 encoded image at the default display size, placeholder without a cover
+        album_image = (await self.encoder.encode_album_art(album_images, DEFAULT_ART_SIZE)
+                       if album_images else None) or self.encoder.get_default_image()
         
         # build track domain object
         return Track(
             name=track_data.get('name', 'Unknown Track'),
             artist=track_data.get('artists', [{}])[0].get('name', 'Unknown Artist'),
             album_image=album_image,
+            album_images=album_images,
             uri=track_data.get('uri', ''),
             id=track_data.get('id', '')
         )
         
+    def _get_fallback_track(self) -> Track:
+        """last good track, or the default one if none was fetched yet"""
+        if self._last_track is None:
+            return self._get_default_track()
+        self.guard.counts["stale_served"] += 1
+        return self._last_track
+        
     def _get_default_track(self) -> Track:
         """create fallback track when no data available"""
         return Track(
             name='Not Playing',
             artist='Spotify',
             album_image=self.encoder.get_default_image(),
+            album_images=[],
             uri='',
             id=''
-        )
\ No newline at end of file
+        )
+
+
+@lru_cache
+def get_auth_client() -> SpotifyAuthClient:
+    """provide app-scoped spotify auth client"""
+    return SpotifyAuthClient(get_settings(), get_http_pool())
+
+
+@lru_cache
+def get_spotify_client() -> SpotifyApiClient:
+    """provide app-scoped spotify api client"""
+    return SpotifyApiClient(
+        get_auth_client(), get_settings(), get_encoder(), get_http_pool(), get_upstream_guard()
+    )
@@ -0,0 +1,174 @@
+import argparse
+import sqlite3
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+from app.config import Settings, get_settings
+from app.api.http import HttpClientPool, get_http_pool
+from app.api.limits import UpstreamGuard, get_upstream_guard
+from app.api.poller import NowPlayingPoller
+from app.api.spotify import SpotifyApiClient, SpotifyAuthClient
+from app.utils.base64 import Base64Encoder, get_encoder
+from app.utils.cache import LRUCache
+
+
+@dataclass(frozen=True)
+class UserCredentials:
+    """spotify credentials stored for one widget user"""
+    key: str
+    refresh_token: str
+    client_id: str = ""
+    client_secret: str = ""
+
+
+class UserStore:
+    """sqlite-backed mapping from widget user key to spotify credentials"""
+
+    def __init__(self, path: str):
+        """open or create the user database"""
+        self.path = path
+        # one connection shared across threads, guarded by a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "key TEXT PRIMARY KEY, "
+                "refresh_token TEXT NOT NULL, "
+                "client_id TEXT NOT NULL DEFAULT '', "
+                "client_secret TEXT NOT NULL DEFAULT '')"
+            )
+
+    def get(self, key: str) -> Optional[UserCredentials]:
+        """look up credentials for a user key"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, refresh_token, client_id, client_secret FROM users WHERE key = ?", (key,)
+            ).fetchone()
+        return UserCredentials(*row) if row else None
+
+    def put(self, credentials: UserCredentials) -> None:
+        """add or replace a user's credentials"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (key, refresh_token, client_id, client_secret) VALUES (?, ?, ?, ?)",
+                (credentials.key, credentials.refresh_token, credentials.client_id, credentials.client_secret)
+            )
+
+    def update_refresh_token(self, key: str, refresh_token: str) -> None:
+        """persist a refresh token rotated by spotify"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE users SET refresh_token = ? WHERE key = ?", (refresh_token, key))
+
+    def delete(self, key: str) -> bool:
+        """remove a user, returning whether it existed"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM users WHERE key = ?", (key,)).rowcount > 0
+
+    def keys(self) -> List[str]:
+        """list stored user keys"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM users ORDER BY key")]
+
+
+class TenantRegistry:
+    """bounded set of per-user now-playing sources built on demand"""
+
+    def __init__(self, store: UserStore, settings: Settings, http: HttpClientPool,
+                 encoder: Base64Encoder, guard: UpstreamGuard, maxsize: int, snapshot_ttl: float):
+        """initialize with user store, shared dependencies and lru bounds"""
+        self.store = store
+        self.settings = settings
+        self.http = http
+        # album art is keyed by cover url, so users share the byte-bounded store
+        self.encoder = encoder
+        # every user's calls count against the same spotify app quota
+        self.guard = guard
+        self.snapshot_ttl = snapshot_ttl
+        # evicted users rebuild from the store on their next request, their old poller stops watching
+        self.pollers: LRUCache[NowPlayingPoller] = LRUCache(maxsize=maxsize, on_evict=NowPlayingPoller.close)
+
+    def get_poller(self, key: str) -> Optional[NowPlayingPoller]:
+        """get now-playing source for a user key, or none if the key is unknown"""
+        poller = self.pollers.get(key)
+        if poller is not None:
+            return poller
+
+        credentials = self.store.get(key)
+        if credentials is None:
+            return None
+        poller = self._build(credentials)
+        self.pollers.set(key, poller)
+        return poller
+
+    def _build(self, credentials: UserCredentials) -> NowPlayingPoller:
+        """wire token manager, api client and snapshot for one user"""
+        settings = self.settings.model_copy(update={
+            "refresh_token": credentials.refresh_token,
+            "client_id": credentials.client_id or self.settings.client_id,
+            "client_secret": credentials.client_secret or self.settings.client_secret,
+            # rotated tokens go to the user store instead of the shared token file
+            "token_cache_path": "",
+        })
+        auth_client = SpotifyAuthClient(
+            settings, self.http,
+            on_refresh_token_rotated=lambda token: self.store.update_refresh_token(credentials.key, token)
+        )
+        client = SpotifyApiClient(auth_client, settings, self.encoder, self.http, self.guard)
+        # never started, snapshots refresh inline once they are older than the ttl
+        return NowPlayingPoller(client, self.snapshot_ttl, max_age=self.snapshot_ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """get tenant cache size and hit/miss counters"""
+        return self.pollers.stats()
+
+
+@lru_cache
+def get_user_store() -> UserStore:
+    """provide app-scoped user store"""
+    return UserStore(get_settings().users_db_path)
+
+
+@lru_cache
+def get_tenants() -> TenantRegistry:
+    """provide app-scoped tenant registry"""
+    settings = get_settings()
+    return TenantRegistry(
+        get_user_store(),
+        settings,
+        get_http_pool(),
+        get_encoder(),
+        get_upstream_guard(),
+        settings.tenant_cache_size,
+        settings.tenant_snapshot_ttl
+    )
+
+
+def main() -> None:
+    """manage widget users from the command line"""
+    parser = argparse.ArgumentParser(description="manage multi-user widget credentials")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="add or replace a user")
+    add.add_argument("key", help="user key used in widget urls")
+    add.add_argument("refresh_token", help="spotify refresh token for the user")
+    add.add_argument("--client-id", default="", help="spotify app client id (default: CLIENT_ID)")
+    add.add_argument("--client-secret", default="", help="spotify app client secret (default: CLIENT_SECRET)")
+    remove = commands.add_parser("remove", help="remove a user")
+    remove.add_argument("key")
+    commands.add_parser("list", help="list user keys")
+    args = parser.parse_args()
+
+    store = get_user_store()
+    if args.command == "add":
+        store.put(UserCredentials(args.key, args.refresh_token, args.client_id, args.client_secret))
+        print(f"stored {args.key}")
+    elif args.command == "remove":
+        print(f"removed {args.key}" if store.delete(args.key) else f"no user {args.key}")
+    else:
+        for key in store.keys():
+            print(key)
+
+
+if __name__ == "__main__":
+    main()
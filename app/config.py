@@ -1,10 +1,20 @@
 from pydantic import Field, BaseModel
 import os
+from pathlib import Path
 from functools import lru_cache
-from dotenv import load_dotenv
 
-# load environment variables
-load_dotenv()
+# serverless cold-start mode, set by the platform environment rather than .env
+COLD_START = os.getenv("COLD_START", "false").lower() == "true"
+
+# load environment variables, platforms that inject them skip the .env lookup
+if not COLD_START:
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# application directories
+BASE_PATH = Path(__file__).parent
+STATIC_PATH = BASE_PATH / "static"
+TEMPLATES_PATH = BASE_PATH / "templates"
 
 
 class Settings(BaseModel):
@@ -18,6 +28,97 @@ class Settings(BaseModel):
     spotify_api_url: str = "https://api.spotify.com/v1"
     auth_api_url: str = "https://accounts.spotify.com/api/token"
     
+    # token management
+    token_refresh_margin: float = Field(default_factory=lambda: float(os.getenv("TOKEN_REFRESH_MARGIN", "60")))
+    token_cache_path: str = Field(default_factory=lambda: os.getenv("TOKEN_CACHE_PATH", ""))
+    
+    # upstream protection for spotify api calls (rate 0 disables the limiter), on by default only with
+    # the background poller, without it every widget request fetches and ordinary page loads would throttle
+    spotify_rate_limit: float = Field(default_factory=lambda: float(os.getenv(
+        "SPOTIFY_RATE_LIMIT", "5" if float(os.getenv("POLL_INTERVAL", "0")) > 0 else "0"
+    )))
+    spotify_rate_burst: int = Field(default_factory=lambda: int(os.getenv("SPOTIFY_RATE_BURST", "10")))
+    circuit_failure_threshold: int = Field(default_factory=lambda: int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")))
+    circuit_reset_timeout: float = Field(default_factory=lambda: float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")))
+    
+    # now-playing fetch strategy: serial or parallel
+    fetch_strategy: str = Field(default_factory=lambda: os.getenv("FETCH_STRATEGY", "serial"))
+    # seconds before a token refresh or api call is given up
+    spotify_timeout: float = Field(default_factory=lambda: float(os.getenv("SPOTIFY_TIMEOUT", "5")))
+    
+    # album art downloads, seconds per attempt and hedging (0 disables hedging)
+    image_timeout: float = Field(default_factory=lambda: float(os.getenv("IMAGE_TIMEOUT", "3")))
+    image_hedge_delay: float = Field(default_factory=lambda: float(os.getenv("IMAGE_HEDGE_DELAY", "0")))
+    image_hedge_attempts: int = Field(default_factory=lambda: int(os.getenv("IMAGE_HEDGE_ATTEMPTS", "2")))
+    
+    # background now-playing poller (0 disables polling)
+    poll_interval: float = Field(default_factory=lambda: float(os.getenv("POLL_INTERVAL", "0")))
+    
+    # poll interval while /events clients are connected and background polling is off
+    events_poll_interval: float = Field(default_factory=lambda: float(os.getenv("EVENTS_POLL_INTERVAL", "5")))
+    
+    # rendered widget output cache entries
+    render_cache_size: int = Field(default_factory=lambda: int(os.getenv("RENDER_CACHE_SIZE", "64")))
+    
+    # widget variants accepted by one batch render request
+    batch_max_widgets: int = Field(default_factory=lambda: int(os.getenv("BATCH_MAX_WIDGETS", "16")))
+    
+    # custom-colored theme variants kept, bounded so arbitrary colors cannot grow memory
+    theme_cache_size: int = Field(default_factory=lambda: int(os.getenv("THEME_CACHE_SIZE", "256")))
+    
+    # precompressed response bodies (brotli needs the optional brotli package)
+    compression: bool = Field(default_factory=lambda: os.getenv("COMPRESSION", "true").lower() == "true")
+    gzip_level: int = Field(default_factory=lambda: int(os.getenv("GZIP_LEVEL", "9")))
+    # short-lived instances rarely reuse a render, so cold starts trade ratio for latency
+    brotli_quality: int = Field(default_factory=lambda: int(os.getenv("BROTLI_QUALITY", "5" if COLD_START else "11")))
+    
+    # album art cache
+    art_cache_max_bytes: int = Field(default_factory=lambda: int(os.getenv("ART_CACHE_MAX_BYTES", str(8 * 1024 * 1024))))
+    art_cache_dir: str = Field(default_factory=lambda: os.getenv("ART_CACHE_DIR", ""))
+    art_cache_disk_max_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("ART_CACHE_DISK_MAX_BYTES", str(64 * 1024 * 1024)))
+    )
+    
+    # album art thumbnails (format is jpeg or webp)
+    art_format: str = Field(default_factory=lambda: os.getenv("ART_FORMAT", "jpeg"))
+    art_quality: int = Field(default_factory=lambda: int(os.getenv("ART_QUALITY", "80")))
+    art_density: float = Field(default_factory=lambda: float(os.getenv("ART_DENSITY", "2")))
+    
+    # multi-user mode, widget user keys map to credentials in a sqlite file
+    multi_user: bool = Field(default_factory=lambda: os.getenv("MULTI_USER", "false").lower() == "true")
+    users_db_path: str = Field(default_factory=lambda: os.getenv("USERS_DB_PATH", "users.db"))
+    tenant_cache_size: int = Field(default_factory=lambda: int(os.getenv("TENANT_CACHE_SIZE", "1000")))
+    tenant_snapshot_ttl: float = Field(default_factory=lambda: float(os.getenv("TENANT_SNAPSHOT_TTL", "5")))
+    
+    # bundled fonts embedded as per-widget glyph subsets (needs fonttools)
+    embed_fonts: bool = Field(default_factory=lambda: os.getenv("EMBED_FONTS", "true").lower() == "true")
+    font_cache_size: int = Field(default_factory=lambda: int(os.getenv("FONT_CACHE_SIZE", "128")))
+    
+    # template minification and persistent jinja bytecode cache
+    minify_templates: bool = Field(default_factory=lambda: os.getenv("MINIFY_TEMPLATES", "true").lower() == "true")
+    template_cache_dir: str = Field(default_factory=lambda: os.getenv("TEMPLATE_CACHE_DIR", ""))
+    
+    # skip startup warm-up and trust the prebuilt asset snapshot, for serverless deployments
+    cold_start: bool = COLD_START
+    
+    # compile stale static assets on startup
+    compile_assets: bool = Field(default_factory=lambda: os.getenv("COMPILE_ASSETS", "false").lower() == "true")
+    
+    # logging and per-stage timing
+    log_level: str = Field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
+    log_format: str = Field(default_factory=lambda: os.getenv("LOG_FORMAT", "json"))
+    server_timing: bool = Field(default_factory=lambda: os.getenv("SERVER_TIMING", "true").lower() == "true")
+    
+    # prometheus /metrics endpoint
+    metrics: bool = Field(default_factory=lambda: os.getenv("METRICS", "true").lower() == "true")
+    
+    # outbound http pool
+    http_max_connections: int = Field(default_factory=lambda: int(os.getenv("HTTP_MAX_CONNECTIONS", "20")))
+    http_max_keepalive: int = Field(default_factory=lambda: int(os.getenv("HTTP_MAX_KEEPALIVE", "10")))
+    http_keepalive_expiry: float = Field(default_factory=lambda: float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")))
+    http_timeout: float = Field(default_factory=lambda: float(os.getenv("HTTP_TIMEOUT", "5")))
+    http2: bool = Field(default_factory=lambda: os.getenv("HTTP2", "true").lower() == "true")
+
     # defaults
     default_eq_color: str = "1ED760"
 
@@ -1,7 +1,27 @@
-from typing import TypedDict, Optional
+import logging
+import re
+from typing import TypedDict, Optional, List
 from enum import Enum
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
+HEX_COLOR = re.compile(r"#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})")
+# equalizer colors that are not hex codes
+EQ_KEYWORDS = ("none", "rainbow")
+DEFAULT_EQ_COLOR = "1ed760"
+
+
+def normalize_color(color: Optional[str]) -> Optional[str]:
+    """canonicalize a hex color to six lowercase digits without #, none if invalid"""
+    match = HEX_COLOR.fullmatch(color.strip()) if color else None
+    if not match:
+        return None
+    digits = match.group(1).lower()
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    return digits
+
 
 class ThemeStyle(str, Enum):
     """theme light/dark mode style"""
@@ -21,11 +41,27 @@ class ThemeType(str, Enum):
     WINDOWSXP = "windowsxp"
 
 
+class AssetMode(str, Enum):
+    """how static assets are referenced from a widget"""
+    # base64 data uris, for image embeds that cannot load sub-resources
+    INLINE = "inline"
+    # content-hashed /static urls, cached by clients across views
+    EXTERNAL = "external"
+
+
+class AlbumImage(TypedDict):
+    """album cover source as listed by the spotify api"""
+    url: str
+    width: Optional[int]
+    height: Optional[int]
+
+
 class Track(TypedDict):
     """track data structure"""
     name: str
     artist: str
     album_image: str
+    album_images: List[AlbumImage]
     uri: str
     id: str
 
@@ -38,6 +74,9 @@ class WidgetConfig:
     color: Optional[str] = None
     spin: bool = False
     eq_color: str = "1ED760"
+    assets: AssetMode = AssetMode.INLINE
+    # html widget patches itself from the track events stream
+    live: bool = False
     
     @classmethod
     def from_query_params(cls, 
@@ -45,7 +84,9 @@ class WidgetConfig:
                          style: str = "light", 
                          color: Optional[str] = None,
                          spin: bool = False, 
-                         eq_color: str = "1ED760") -> "WidgetConfig":
+                         eq_color: str = "1ED760",
+                         assets: str = "inline",
+                         live: bool = False) -> "WidgetConfig":
         """create config from query parameters"""
         theme_type = ThemeType(theme)
         
@@ -55,14 +96,24 @@ class WidgetConfig:
         # color only available for specific themes
         valid_color = None
         if color and theme_type in [ThemeType.IPOD, ThemeType.VINYL, ThemeType.DEFAULT]:
-            # Ensure color is a valid hex code (strip leading # if present)
-            valid_color = color.lstrip('#')
-            print(f"Processing color parameter: {color} -> {valid_color}")
+            # one canonical spelling per color keeps cache keys from multiplying, invalid codes are ignored
+            valid_color = normalize_color(color)
+            logger.debug("processing color parameter %s -> %s", color, valid_color)
+        
+        # keywords or a canonical hex code, anything else falls back to the default
+        eq_color = eq_color.strip().lower()
+        if eq_color not in EQ_KEYWORDS:
+            eq_color = normalize_color(eq_color) or DEFAULT_EQ_COLOR
+        
+        # unknown asset modes keep the inline default that works everywhere
+        asset_mode = AssetMode.EXTERNAL if assets == AssetMode.EXTERNAL.value else AssetMode.INLINE
         
         return cls(
             theme=theme_type,
             style=theme_style,
             color=valid_color,
             spin=spin,
-            eq_color=eq_color
+            eq_color=eq_color,
+            assets=asset_mode,
+            live=live
         )
\ No newline at end of file
@@ -1,6 +1,13 @@
-from typing import Dict, Any
+import base64
+import binascii
+import colorsys
+import hashlib
+from typing import Dict, Any, List, Optional
 
 from app.domain.models import Track, WidgetConfig
+from app.utils.cache import LazyMapping, LRUCache
+from app.utils.images import sniff_mime
+from app.utils.palette import RGB, extract_palette
 
 
 class VisualizationService:
@@ -29,47 +36,67 @@ class VisualizationService:
 class ColorExtractionService:
     """service for extracting colors from images for dynamic backgrounds"""
     
-    def __init__(self):
-        """initialize with default colors"""
+    def __init__(self, cache_size: int = 256):
+        """initialize with default colors and palette cache"""
         self.default_colors = {
             "light": ["#F6F8FA", "#E1E4E8"],
             "dark": ["#161B22", "#0D1117"]
         }
+        # palettes keyed by content digest so they are stable across processes
+        self._palettes: LRUCache[List[RGB]] = LRUCache(maxsize=cache_size)
+    
+    def get_palette(self, album_image: str) -> List[RGB]:
+        """get dominant colors of a base64 encoded image, cached by content digest"""
+        digest = hashlib.sha1(album_image.encode("ascii", "ignore")).hexdigest()
+        palette = self._palettes.get(digest)
+        if palette is None:
+            try:
+                palette = extract_palette(base64.b64decode(album_image))
+            except (binascii.Error, ValueError):
+                palette = []
+            self._palettes.set(digest, palette)
+        return palette
     
     def extract_gradient_colors(self, album_image: str, is_dark: bool) -> Dict[str, str]:
         """
         extract gradient colors from album art for dynamic backgrounds
-        since we can't process the image directly, we'll use predetermined colors
-        based on the hash of the image
+        hue and saturation come from the two most common colors of the cover,
+        lightness is fixed per style so text stays readable
         """
-        # fallback to default colors if image is empty
-        if not album_image:
+        palette = self.get_palette(album_image) if album_image else []
+        
+        # fallback to default colors if image is empty or could not be decoded
+        if not palette:
             colors = self.default_colors["dark" if is_dark else "light"]
             return {
                 "primary_color": colors[0],
                 "secondary_color": colors[1],
                 "gradient": f"linear-gradient(135deg, {colors[0]}, {colors[1]})",
-                "text_color": "#FFFFFF" if is_dark else "#000000"
+                "text_color": "#FFFFFF" if is_dark else "#000000",
+                "palette": []
             }
             
-        # use a simple hash of the image to simulate color extraction
-        image_hash = hash(album_image) % 1000
+        dominant = palette[0]
+        accent = palette[1] if len(palette) > 1 else palette[0]
         
-        # generate pseudo-random colors based on the hash
-        hue = (image_hash % 360)
-        saturation = 70 if is_dark else 40
         lightness_primary = 20 if is_dark else 80
         lightness_secondary = 30 if is_dark else 70
         
-        primary = f"hsl({hue}, {saturation}%, {lightness_primary}%)"
-        secondary = f"hsl({(hue + 30) % 360}, {saturation}%, {lightness_secondary}%)"
+        primary = self._hsl(dominant, lightness_primary)
+        secondary = self._hsl(accent, lightness_secondary)
         
         return {
             "primary_color": primary,
             "secondary_color": secondary,
             "gradient": f"linear-gradient(135deg, {primary}, {secondary})",
-            "text_color": "#FFFFFF" if is_dark else "#000000"
+            "text_color": "#FFFFFF" if is_dark else "#000000",
+            "palette": [f"#{r:02X}{g:02X}{b:02X}" for r, g, b in palette]
         }
+    
+    def _hsl(self, color: RGB, lightness: int) -> str:
+        """format color as css hsl with fixed lightness"""
+        hue, _, saturation = colorsys.rgb_to_hls(*(channel / 255 for channel in color))
+        return f"hsl({round(hue * 360)}, {round(saturation * 100)}%, {lightness}%)"
 
 class WidgetRenderingService:
     """service for preparing widget rendering data"""
@@ -81,28 +108,31 @@ class WidgetRenderingService:
         self.color_extraction = color_extraction_service or ColorExtractionService()
     
     def prepare_rendering_data(self, track: Track, config: WidgetConfig, 
-                              spotify_logo: str) -> Dict[str, Any]:
+                              spotify_logo: str, album_image: Optional[str] = None) -> Dict[str, Any]:
         """prepare complete data for widget template rendering"""
+        # use theme-sized album art when provided
+        album_image = album_image or track["album_image"]
+        
         # determine bar count
         bar_count = 10  # fixed at 10 bars for the new equalizer
         
         # generate equalizer html if needed (now empty as we're using CSS directly)
         eq_bars_html = self.visualization.generate_equalizer(bar_count, config.eq_color)
         
-        # extract colors for dynamic background if using vinyl theme
-        dynamic_colors = {}
-        if config.theme == "vinyl":
-            is_dark = config.style == "dark"
-            dynamic_colors = self.color_extraction.extract_gradient_colors(
-                track["album_image"], is_dark
-            )
+        # extract colors for dynamic backgrounds, available to every theme but
+        # only computed when a template reads them, the palette needs numpy
+        dynamic_colors = LazyMapping(lambda: self.color_extraction.extract_gradient_colors(
+            album_image, config.style == "dark"
+        ))
         
         # return complete template data
         return {
             "track_name": track["name"],
             "track_artist": track["artist"],
             "track_id": track["id"],
-            "base_64_track_image": track["album_image"],
+            "base_64_track_image": album_image,
+            "track_image_mime": sniff_mime(album_image),
+            # image src, a data uri or a hashed static url
             "logo": spotify_logo,
             "spin": config.spin,
             "eq_color": config.eq_color,
@@ -1,73 +1,163 @@
-from fastapi import FastAPI, Query, Request, Depends
-from fastapi.responses import HTMLResponse, Response
+from fastapi import FastAPI, HTTPException, Query, Request, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
-from typing import Optional
-
-from app.config import get_settings, Settings
-from app.utils.base64 import Base64Encoder
-from app.api.spotify import SpotifyAuthClient, SpotifyApiClient
-from app.domain.models import ThemeStyle, ThemeType, WidgetConfig
-from app.domain.services import VisualizationService, WidgetRenderingService
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from app.config import STATIC_PATH, get_settings
+from app.utils.assets import compile_assets, stale_assets
+from app.utils.log import configure_logging
+from app.utils.metrics import REQUESTS, RESPONSE_BYTES, Samples, registry
+from app.utils.static import STATIC_URL, HashedStaticFiles
+from app.utils.timing import TimingMiddleware
+from app.api.http import get_http_pool
+from app.api.limits import CircuitBreaker, get_upstream_guard
+from app.api.poller import NowPlayingPoller, get_poller
+from app.api.spotify import get_auth_client
+from app.api.tenants import get_tenants
+from app.domain.models import ThemeStyle, ThemeType, Track, WidgetConfig
+from app.render.adapters import HTML, NATIVE, SVG, OutputAdapter
+from app.render.compression import negotiate
+from app.render.engine import WidgetRenderer, get_renderer, get_template_env
+from app.render.templates import precompile
 from app.themes import ThemeRegistry
+from app.utils.base64 import get_encoder
+from app.utils.images import select_source
 
 
-# initialize app
-app = FastAPI(title="Spotify Widget")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """manage process-wide resources across the app lifetime"""
+    # refresh compiled static assets when sources changed
+    if get_settings().compile_assets:
+        stale = stale_assets(STATIC_PATH)
+        if stale:
+            try:
+                compile_assets(STATIC_PATH, stale)
+            except OSError:
+                # read-only deployments fall back to the raw assets
+                pass
+    
+    # compile every template now, or load it from the bytecode cache, instead of on first hit,
+    # cold starts compile only the templates their requests use
+    if not get_settings().cold_start:
+        precompile(get_template_env())
+    
+    poller = get_poller()
+    poller.start()
+    yield
+    await poller.stop()
+    # release pooled outbound connections on shutdown
+    await get_http_pool().aclose()
 
-# set up directories
-BASE_PATH = Path(__file__).parent
-STATIC_PATH = BASE_PATH / "static"
-TEMPLATES_PATH = BASE_PATH / "templates"
+
+# initialize app
+configure_logging(get_settings().log_level, get_settings().log_format)
+app = FastAPI(title="Spotify Widget", lifespan=lifespan)
+app.add_middleware(TimingMiddleware, header=get_settings().server_timing)
 
 # set up static and templates
-templates = Jinja2Templates(directory=str(TEMPLATES_PATH))
-app.mount("/static", StaticFiles(directory=str(STATIC_PATH)), name="static")
+templates = Jinja2Templates(env=get_template_env())
+# content-hashed asset urls are served with immutable caching
+app.mount(STATIC_URL, HashedStaticFiles(directory=str(STATIC_PATH)), name="static")
 
 
-# dependency injection container
-def get_encoder() -> Base64Encoder:
-    """provide base64 encoder instance"""
-    return Base64Encoder(STATIC_PATH)
+def etag_matches(request: Request, etag: str) -> bool:
+    """check whether client already holds the current render"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    # weak comparison is allowed for if-none-match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
 
 
-def get_auth_client(settings: Settings = Depends(get_settings)) -> SpotifyAuthClient:
-    """provide spotify auth client"""
-    return SpotifyAuthClient(settings)
+def cache_headers(etag: str, encoding: Optional[str] = None) -> Dict[str, str]:
+    """headers that let clients and camo revalidate cheaply"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if encoding:
+        # each coding is a distinct representation with its own strong validator
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+        headers["Content-Encoding"] = encoding
+    return headers
 
 
-def get_spotify_client(
-    auth_client: SpotifyAuthClient = Depends(get_auth_client),
-    settings: Settings = Depends(get_settings),
-    encoder: Base64Encoder = Depends(get_encoder)
-) -> SpotifyApiClient:
-    """provide spotify api client"""
-    return SpotifyApiClient(auth_client, settings, encoder)
+def uncacheable(headers: Dict[str, str]) -> None:
+    """strip the validator from a placeholder render, so clients refetch instead of revalidating"""
+    headers.pop("ETag", None)
+    headers["Cache-Control"] = "no-store"
 
 
-def get_visualization_service() -> VisualizationService:
-    """provide visualization service"""
-    return VisualizationService()
+def get_track_source(
+    request: Request,
+    user_key: Optional[str] = Query(None, alias="user", description="Widget user key (multi-user mode)")
+) -> NowPlayingPoller:
+    """resolve now-playing source for the requested user, defaulting to the configured account"""
+    key = request.path_params.get("user") or user_key
+    if not key:
+        return get_poller()
+    if not get_settings().multi_user:
+        # a user-scoped url must not silently show the configured account
+        raise HTTPException(status_code=404, detail="Unknown user")
+    
+    poller = get_tenants().get_poller(key)
+    if poller is None:
+        raise HTTPException(status_code=404, detail="Unknown user")
+    return poller
 
 
-def get_rendering_service(
-    visualization: VisualizationService = Depends(get_visualization_service)
-) -> WidgetRenderingService:
-    """provide widget rendering service"""
-    return WidgetRenderingService(visualization)
+async def render_widget(request: Request, config: WidgetConfig, adapter: OutputAdapter,
+                        poller: NowPlayingPoller, renderer: WidgetRenderer) -> Response:
+    """render widget for an endpoint, answering conditional requests without rendering"""
+    endpoint = request.scope["route"].path
+    track = await poller.get_current_track()
+    encoding = negotiate(request.headers.get("accept-encoding"), renderer.encodings)
+    
+    headers = cache_headers(renderer.etag_for(adapter, track, config), encoding)
+    if etag_matches(request, headers["ETag"]):
+        headers.pop("Content-Encoding", None)
+        REQUESTS.inc(endpoint, config.theme.value, "304")
+        return Response(status_code=304, headers=headers)
+    
+    REQUESTS.inc(endpoint, config.theme.value, "200")
+    template_name = renderer.template_for(config, adapter).name
+    widget = renderer.cached(track, config, adapter)
+    if widget is None:
+        # send chunks as the template renders them, the finished body fills the render cache
+        cacheable, chunks = await renderer.stream(track, config, adapter, encoding)
+        if not cacheable:
+            uncacheable(headers)
+        body = observed(chunks, template_name, encoding or "identity")
+        return StreamingResponse(body, media_type=adapter.media_type, headers=headers)
+    
+    body = await renderer.body_for(widget, encoding)
+    RESPONSE_BYTES.observe(len(body), template_name, encoding or "identity")
+    return Response(content=body, media_type=widget.media_type, headers=headers)
+
+
+async def observed(body: AsyncIterator[bytes], template: str, encoding: str) -> AsyncIterator[bytes]:
+    """pass a streamed body through, recording its size once sent"""
+    size = 0
+    async for chunk in body:
+        size += len(chunk)
+        yield chunk
+    RESPONSE_BYTES.observe(size, template, encoding)
 
 
 @app.get("/", response_class=HTMLResponse)
+@app.get("/u/{user}", response_class=HTMLResponse)
 async def get_widget(
     request: Request,
     theme: str = Query("default", description="Theme (default/vinyl/ipod/retro/windows98)"),
     style: str = Query("light", description="Style (light/dark)"),
     color: Optional[str] = Query(None, description="HEX color code (only for ipod, vinyl, and default)"),
     eq_color: str = Query("1ED760", description="Equalizer color (HEX without # or 'rainbow' or 'none')"),
-    spotify_client: SpotifyApiClient = Depends(get_spotify_client),
-    rendering_service: WidgetRenderingService = Depends(get_rendering_service),
-    encoder: Base64Encoder = Depends(get_encoder),
+    assets: str = Query("inline", description="Asset references (inline/external), external links cacheable /static urls"),
+    live: bool = Query(False, description="Patch track name, artist and art in place from /events"),
+    poller: NowPlayingPoller = Depends(get_track_source),
+    renderer: WidgetRenderer = Depends(get_renderer),
     # support for old parameter names
     theme_type: Optional[str] = Query(None, include_in_schema=False),
     theme_style: Optional[str] = Query(None, include_in_schema=False)
@@ -77,75 +167,31 @@ async def get_widget(
     final_theme = theme_type or theme
     final_style = theme_style or style
     
-    print(f"Request params - theme: {final_theme}, style: {final_style}, color: {color}")
-    
     # create widget configuration with parameters
     config = WidgetConfig.from_query_params(
         theme=final_theme, 
         style=final_style, 
         color=color,
-        eq_color=eq_color
+        eq_color=eq_color,
+        assets=assets,
+        live=live
     )
     
-    # get data from spotify
-    track = await spotify_client.get_current_track()
-    
-    # prepare base rendering data
-    base_data = rendering_service.prepare_rendering_data(
-        track, config, encoder.get_spotify_logo()
-    )
-    
-    # add theme-specific assets
-    if config.theme == ThemeType.VINYL:
-        base_data["vinyl_svg"] = encoder.get_vinyl_overlay()
-        base_data["vinyl_needle_svg"] = encoder.get_vinyl_needle()
-    
-    # apply theme-specific transformations
-    theme_instance = ThemeRegistry.get_theme(config.theme, config.style, config.color)
-    theme_data = theme_instance.transform_data(base_data)
-    
-    # ensure css variable is properly passed
-    if "css" not in theme_data:
-        theme_data["css"] = theme_instance.css
-        
-    # debug info
-    print(f"Background color after theme processing: {theme_data['css'].get('background_color')}")
-    
-    # add request to context
-    context = {"request": request, **theme_data}
-    
-    # select appropriate template based on theme
-    template_name = "widget.html"  # default
-    
-    if config.theme == ThemeType.IPOD:
-        template_name = "ipod.html"
-    elif config.theme == ThemeType.VINYL:
-        template_name = "vinyl.html"
-        context["spin"] = True
-        context["use_vinyl_svg"] = True
-    elif config.theme == ThemeType.RETRO:
-        template_name = "retro.html"
-        context["show_equalizer"] = True
-    elif config.theme == ThemeType.WINDOWS98:
-        template_name = "windows98.html"
-    
-    # override with theme-specific template if provided
-    if "template_name" in theme_data:
-        template_name = theme_data["template_name"]
-    
-    return templates.TemplateResponse(template_name, context)
+    return await render_widget(request, config, HTML, poller, renderer)
 
 
 @app.get("/github", response_class=Response)
+@app.get("/u/{user}/github", response_class=Response)
 async def get_github_image(
     request: Request,
     theme: str = Query("default", description="Theme (default/vinyl/ipod/retro/windows98)"),
     style: str = Query("light", description="Style (light/dark)"),
     color: Optional[str] = Query(None, description="HEX color code (only for ipod, vinyl, and default)"),
     eq_color: str = Query("1ED760", description="Equalizer color (HEX without # or 'rainbow' or 'none')"),
-    spotify_client: SpotifyApiClient = Depends(get_spotify_client),
-    rendering_service: WidgetRenderingService = Depends(get_rendering_service),
-    encoder: Base64Encoder = Depends(get_encoder),
+    assets: str = Query("inline", description="Asset references (inline/external), external links cacheable /static urls"),
+    mode: str = Query("foreign", description="Render mode (foreign/native), native is pure svg for default, retro and windows98"),
+    poller: NowPlayingPoller = Depends(get_track_source),
+    renderer: WidgetRenderer = Depends(get_renderer),
     theme_type: Optional[str] = Query(None, include_in_schema=False),
     theme_style: Optional[str] = Query(None, include_in_schema=False)
 ):
@@ -159,75 +205,195 @@ async def get_github_image(
         theme=final_theme, 
         style=final_style, 
         color=color,
-        eq_color=eq_color
+        eq_color=eq_color,
+        assets=assets
     )
     
-    # get data from spotify
-    track = await spotify_client.get_current_track()
+    # themes without a native template keep the foreignObject rendering
+    adapter = NATIVE if mode == "native" and renderer.supports_native(config) else SVG
+    return await render_widget(request, config, adapter, poller, renderer)
+
+
+class WidgetSpec(BaseModel):
+    """one widget variant of a batch render, same options as the widget endpoints"""
+    theme: ThemeType = ThemeType.DEFAULT
+    style: ThemeStyle = ThemeStyle.LIGHT
+    color: Optional[str] = None
+    eq_color: str = "1ED760"
+    # html as served by /, svg as served by /github
+    output: Literal["html", "svg"] = "svg"
+    mode: Literal["foreign", "native"] = "foreign"
+    assets: Literal["inline", "external"] = "inline"
+
+
+class BatchRequest(BaseModel):
+    """widget variants to render from one now-playing track"""
+    widgets: List[WidgetSpec] = Field(min_length=1)
+
+
+@app.post("/batch")
+@app.post("/u/{user}/batch")
+async def post_batch(
+    request: Request,
+    batch: BatchRequest,
+    poller: NowPlayingPoller = Depends(get_track_source),
+    renderer: WidgetRenderer = Depends(get_renderer)
+):
+    """render several widget variants with one track fetch and cover download"""
+    limit = get_settings().batch_max_widgets
+    if len(batch.widgets) > limit:
+        raise HTTPException(status_code=422, detail=f"At most {limit} widgets per batch")
     
-    # prepare base rendering data
-    base_data = rendering_service.prepare_rendering_data(
-        track, config, encoder.get_spotify_logo()
-    )
+    track = await poller.get_current_track()
+    variants = []
+    for spec in batch.widgets:
+        config = WidgetConfig.from_query_params(
+            theme=spec.theme.value,
+            style=spec.style.value,
+            color=spec.color,
+            eq_color=spec.eq_color,
+            assets=spec.assets
+        )
+        if spec.output == "html":
+            adapter = HTML
+        else:
+            adapter = NATIVE if spec.mode == "native" and renderer.supports_native(config) else SVG
+        variants.append((config, adapter))
     
-    # add theme-specific assets
-    if config.theme == ThemeType.VINYL:
-        base_data["vinyl_svg"] = encoder.get_vinyl_overlay()
-        base_data["vinyl_needle_svg"] = encoder.get_vinyl_needle()
-    
-    # apply theme-specific transformations
-    theme_instance = ThemeRegistry.get_theme(config.theme, config.style, config.color)
-    theme_data = theme_instance.transform_data(base_data)
-    
-    # ensure css variable is properly passed
-    if "css" not in theme_data:
-        theme_data["css"] = theme_instance.css
-    
-    # add request to context
-    context = {"request": request, **theme_data}
-    
-    # select appropriate template based on theme
-    template_name = "widget.html"  # default
-    
-    if config.theme == ThemeType.IPOD:
-        template_name = "ipod.html"
-    elif config.theme == ThemeType.VINYL:
-        template_name = "vinyl.html"
-        context["spin"] = True
-        context["use_vinyl_svg"] = True
-    elif config.theme == ThemeType.RETRO:
-        template_name = "retro.html"
-        context["show_equalizer"] = True
-    elif config.theme == ThemeType.WINDOWS98:
-        template_name = "windows98.html"
-    
-    # override with theme-specific template if provided
-    if "template_name" in theme_data:
-        template_name = theme_data["template_name"]
-    
-    # render the template to string
-    content = templates.get_template(template_name).render(context)
-    
-    # fix any potential XML entity issues by properly encoding ampersands
-    content = content.replace("&", "&amp;").replace("&amp;amp;", "&amp;")
-    
-    # return plain SVG response
-    return Response(
-        content=content,
-        media_type="image/svg+xml"
+    widgets = await renderer.render_many(track, variants)
+    REQUESTS.inc(request.scope["route"].path, "", "200")
+    # the envelope differs per request, compressing it would redo the costliest step on every call
+    return JSONResponse({
+        "track": {"id": track["id"], "name": track["name"], "artist": track["artist"]},
+        "widgets": [
+            {
+                "theme": config.theme.value,
+                "style": config.style.value,
+                "output": adapter.name,
+                "media_type": widget.media_type,
+                "etag": widget.etag if widget.cacheable else None,
+                "content": widget.content,
+            }
+            for (config, adapter), widget in zip(variants, widgets)
+        ],
+    })
+
+
+# seconds between comment lines that keep idle proxies from closing an event stream
+EVENTS_KEEPALIVE = 15.0
+# cover size linked from track events, live widgets show art at most this large
+EVENTS_ART_PX = 300
+
+
+def track_event(track: Track) -> str:
+    """compact server-sent event announcing the now-playing track"""
+    payload = {
+        "id": track["id"],
+        "name": track["name"],
+        "artist": track["artist"],
+        # tracks without a cover send the placeholder, so the previous cover is replaced too
+        "art": (select_source(track["album_images"], EVENTS_ART_PX)
+                or f"data:image/svg+xml;base64,{get_encoder().get_default_image()}"),
+    }
+    return f"event: track\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+async def track_events(poller: NowPlayingPoller, interval: float) -> AsyncIterator[str]:
+    """current track on connect, then one event per track change"""
+    async with poller.watching(interval):
+        version = 0
+        while True:
+            current = await poller.wait_for_change(version, EVENTS_KEEPALIVE)
+            if poller.closed:
+                # evicted tenant, the browser reconnects and gets the user's new poller
+                return
+            if current == version:
+                yield ": keepalive\n\n"
+                continue
+            version = current
+            yield track_event(poller.snapshot)
+
+
+@app.get("/events")
+@app.get("/u/{user}/events")
+async def get_events(
+    request: Request,
+    poller: NowPlayingPoller = Depends(get_track_source)
+):
+    """stream track changes to live widgets, every client shares one upstream poll"""
+    interval = poller.interval if poller.enabled else get_settings().events_poll_interval
+    REQUESTS.inc(request.scope["route"].path, "", "200")
+    return StreamingResponse(
+        track_events(poller, interval),
+        media_type="text/event-stream",
+        # reverse proxies must pass events through as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @app.get("/link", response_class=HTMLResponse)
+@app.get("/u/{user}/link", response_class=HTMLResponse)
 async def get_link_page(
     request: Request,
-    spotify_client: SpotifyApiClient = Depends(get_spotify_client)
+    poller: NowPlayingPoller = Depends(get_track_source)
 ):
     """generate page with embedded player"""
-    track = await spotify_client.get_current_track()
+    track = await poller.get_current_track()
     embed_link = f"https://open.spotify.com/embed/track/{track['id']}"
+    REQUESTS.inc(request.scope["route"].path, "", "200")
     
     return templates.TemplateResponse(
         "link.html", 
         {"request": request, "embed_link": embed_link}
-    )
\ No newline at end of file
+    )
+
+
+def cache_stats() -> Iterator[Tuple[str, int, int, int]]:
+    """name, hits, misses and entries of every in-process cache"""
+    auth_clients = [get_auth_client()]
+    if get_settings().multi_user:
+        # only resident tenants are counted, evictions reset their share
+        auth_clients += [poller.client.auth_client for poller in get_tenants().pollers.values()]
+        tenants = get_tenants().pollers
+        yield "tenants", tenants.hits, tenants.misses, len(tenants)
+    yield ("token", sum(client.hits for client in auth_clients),
+           sum(client.misses for client in auth_clients), sum(client.has_valid_token for client in auth_clients))
+    
+    art = get_encoder().art_store
+    yield "album_art", art.hits + art.disk_hits, art.misses, len(art)
+    
+    yield "themes", ThemeRegistry.base_hits, ThemeRegistry.base_misses, ThemeRegistry.base_count()
+    
+    themes = ThemeRegistry.variants()
+    yield "theme_variants", themes.hits, themes.misses, len(themes)
+    
+    render = get_renderer().cache
+    yield "render", render.hits, render.misses, len(render)
+
+
+def cache_samples(field: int) -> Samples:
+    """one cache_stats column as labelled samples"""
+    return [({"cache": stats[0]}, stats[field]) for stats in cache_stats()]
+
+
+def guard_samples() -> Samples:
+    """upstream guard event counters"""
+    return [({"event": event}, count) for event, count in get_upstream_guard().counts.items()]
+
+
+registry.collector("widget_cache_hits_total", "Cache hits by cache", "counter", lambda: cache_samples(1))
+registry.collector("widget_cache_misses_total", "Cache misses by cache", "counter", lambda: cache_samples(2))
+registry.collector("widget_cache_entries", "Entries currently held by cache", "gauge", lambda: cache_samples(3))
+registry.collector("spotify_guard_events_total", "Rate limiter and circuit breaker events", "counter", guard_samples)
+registry.collector(
+    "spotify_circuit_open", "Whether the spotify circuit breaker is open", "gauge",
+    lambda: [({}, int(get_upstream_guard().breaker.state == CircuitBreaker.OPEN))]
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """expose runtime metrics in prometheus text format"""
+    if not get_settings().metrics:
+        raise HTTPException(status_code=404)
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,36 @@
+class OutputAdapter:
+    """describes how rendered template markup is served"""
+
+    # short name used in cache keys
+    name: str = ""
+    media_type: str = ""
+    # whether the adapter renders a theme's native svg template
+    native: bool = False
+
+
+class HtmlAdapter(OutputAdapter):
+    """serves the svg markup inside an html response"""
+
+    name = "html"
+    media_type = "text/html; charset=utf-8"
+
+
+class SvgAdapter(OutputAdapter):
+    """serves standalone svg for image embeds"""
+
+    # templates are well-formed xml and autoescaped, so bodies stream out without a fixup pass
+    name = "svg"
+    media_type = "image/svg+xml"
+
+
+class NativeSvgAdapter(OutputAdapter):
+    """serves pure svg rendered from native templates, without foreignObject"""
+
+    name = "native"
+    media_type = "image/svg+xml"
+    native = True
+
+
+HTML = HtmlAdapter()
+SVG = SvgAdapter()
+NATIVE = NativeSvgAdapter()
@@ -0,0 +1,147 @@
+import argparse
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+# supported content-codings, most preferred first
+ENCODINGS = ("br", "gzip")
+
+
+def brotli_available() -> bool:
+    """whether the optional brotli package is installed"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """content-codings this process can produce"""
+    return tuple(encoding for encoding in ENCODINGS if encoding != "br" or brotli_available())
+
+
+class Compressor:
+    """incremental compressor, output does not depend on how the body is chunked"""
+
+    def __init__(self, encoding: str, gzip_level: int = 9, brotli_quality: int = 11):
+        """initialize for a content-coding"""
+        if encoding == "br":
+            import brotli
+            coder = brotli.Compressor(mode=brotli.MODE_TEXT, quality=brotli_quality)
+            self._process, self._finish = coder.process, coder.finish
+        elif encoding == "gzip":
+            # gzip container with zero mtime keeps output byte-identical across processes
+            coder = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process, self._finish = coder.compress, coder.flush
+        else:
+            raise ValueError(f"unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        """feed a chunk, returning whatever compressed bytes are ready"""
+        return self._process(data)
+
+    def flush(self) -> bytes:
+        """finish the stream, returning the remaining compressed bytes"""
+        return self._finish()
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = 9, brotli_quality: int = 11) -> bytes:
+    """compress body with the given content-coding"""
+    # same coder as streamed responses, so both paths cache identical bytes
+    coder = Compressor(encoding, gzip_level, brotli_quality)
+    return coder.compress(data) + coder.flush()
+
+
+def negotiate(accept_encoding: Optional[str], encodings: Tuple[str, ...]) -> Optional[str]:
+    """pick the preferred supported coding from an accept-encoding header, or none for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        param = params.strip()
+        if param.startswith("q="):
+            try:
+                weight = float(param[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        # ties keep server preference order
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def byte_savings_report(themes: Optional[List[str]] = None) -> List[Dict]:
+    """render every theme offline and measure compressed sizes"""
+    import asyncio
+    from app.domain.models import ThemeType, Track, WidgetConfig
+    from app.render.adapters import HTML, SVG
+    from app.render.engine import get_renderer
+
+    renderer = get_renderer()
+    encoder = renderer.encoder
+    # offline track, no spotify or image cdn calls
+    track = Track(
+        name="Compression Check & Friends",
+        artist="Spotify",
+        album_image=encoder.get_default_image(),
+        album_images=[],
+        uri="",
+        id="compression-check"
+    )
+
+    rows = []
+    for theme in themes or [theme.value for theme in ThemeType]:
+        config = WidgetConfig.from_query_params(theme=theme, style="light")
+        for adapter in (HTML, SVG):
+            widget = asyncio.run(renderer.render(track, config, adapter))
+            raw = widget.content.encode("utf-8")
+            row = {"theme": theme, "output": adapter.name, "identity": len(raw)}
+            for encoding in available_encodings():
+                row[encoding] = len(compress(raw, encoding))
+            rows.append(row)
+    return rows
+
+
+def format_report(rows: List[Dict]) -> str:
+    """format byte savings as an aligned table"""
+    encodings = available_encodings()
+    lines = [f"{'theme':<16}{'output':<8}{'identity':>10}" + "".join(f"{e:>10}{'saved':>8}" for e in encodings)]
+    for row in rows:
+        line = f"{row['theme']:<16}{row['output']:<8}{row['identity']:>10,}"
+        for encoding in encodings:
+            saved = 1 - row[encoding] / row["identity"] if row["identity"] else 0.0
+            line += f"{row[encoding]:>10,}{saved:>8.0%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """print per-theme compression savings, failing if any variant is not smaller"""
+    parser = argparse.ArgumentParser(description="measure precompressed widget sizes per theme")
+    parser.add_argument("themes", nargs="*", help="themes to measure (default: all)")
+    parser.add_argument("--min-savings", type=float, default=0.0,
+                        help="fail unless every variant saves at least this fraction")
+    args = parser.parse_args()
+
+    rows = byte_savings_report(args.themes)
+    print(format_report(rows))
+    failures = [
+        f"{row['theme']}/{row['output']}/{encoding}"
+        for row in rows
+        for encoding in available_encodings()
+        if row[encoding] > row["identity"] * (1 - args.min_savings) or row[encoding] >= row["identity"]
+    ]
+    if failures:
+        raise SystemExit(f"insufficient savings: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+import jinja2
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from app.config import STATIC_PATH, TEMPLATES_PATH, get_settings
+from app.domain.models import AssetMode, ThemeStyle, ThemeType, Track, WidgetConfig
+from app.domain.services import VisualizationService, WidgetRenderingService
+from app.render.adapters import OutputAdapter
+from app.render import templates as template_module
+from app.render.compression import Compressor, available_encodings, compress
+from app.render.templates import create_environment
+from app.themes import ThemeRegistry
+from app.themes import base as theme_base
+from app.themes.base import BaseTheme
+from app.utils.assets import COMPILED_DIR, SNAPSHOT_NAME
+from app.utils.base64 import Base64Encoder, get_encoder
+from app.utils.cache import LRUCache
+from app.utils.fonts import BUNDLED_FONTS, FontSubsetter, get_font_subsetter
+from app.utils.images import DEFAULT_ART_SIZE
+from app.utils.metrics import RENDER_SECONDS
+from app.utils.static import asset_url
+from app.utils.timing import timed
+
+# characters per streamed chunk, jinja yields many tiny strings per template
+STREAM_CHUNK_SIZE = 16384
+
+
+def coalesce(parts: Iterable[str], size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """join generated template output into chunks of at least size characters"""
+    buffer: List[str] = []
+    buffered = 0
+    for part in parts:
+        buffer.append(part)
+        buffered += len(part)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """yield an already produced chunk ahead of the remaining ones"""
+    if first:
+        yield first
+    async for chunk in rest:
+        yield chunk
+
+
+@dataclass(frozen=True)
+class RenderedWidget:
+    """rendered widget body with its cache validator"""
+    content: str
+    etag: str
+    media_type: str
+    # compressed bodies by content-coding, filled once per cached render
+    encoded: Dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+    # false when built from placeholder art, so neither the body nor its etag may be reused
+    cacheable: bool = True
+
+
+class WidgetRenderer:
+    """single render pipeline shared by every widget endpoint"""
+
+    def __init__(self, env: jinja2.Environment, encoder: Base64Encoder,
+                 rendering_service: WidgetRenderingService, cache_size: int,
+                 encodings: Tuple[str, ...] = (), gzip_level: int = 9, brotli_quality: int = 11,
+                 fonts: Optional[FontSubsetter] = None):
+        """initialize with template environment, rendering dependencies and response codings"""
+        self.env = env
+        self.encoder = encoder
+        self.fonts = fonts
+        self.rendering_service = rendering_service
+        self.cache: LRUCache[RenderedWidget] = LRUCache(maxsize=cache_size)
+        self.encodings = encodings
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+        # base64 payloads of static assets for inline references
+        self.inline_assets: Dict[str, Callable[[], str]] = {
+            "spotify.svg": encoder.get_spotify_logo,
+            "vinyl.svg": encoder.get_vinyl_overlay,
+            "vinyl-needle.svg": encoder.get_vinyl_needle,
+        }
+
+        # templates by theme and native flag, compiled on first use so cold starts skip unused themes
+        self.templates: Dict[Tuple[ThemeType, bool], jinja2.Template] = {}
+
+        # digest of every request-independent input to the output, so deploys invalidate old etags
+        digest = hashlib.sha1()
+        # minified and raw sources render different bytes, and the minifier itself may change
+        digest.update(type(env.loader).__name__.encode("utf-8"))
+        digest.update(Path(template_module.__file__).read_bytes())
+        for path in sorted(TEMPLATES_PATH.glob("*.html")) + sorted(TEMPLATES_PATH.glob("native/*.svg")):
+            digest.update(path.read_bytes())
+        # shared theme behavior, each theme's own code and specs go into theme_digest
+        digest.update(Path(theme_base.__file__).read_bytes())
+        # album art bytes
+        settings = encoder.settings
+        digest.update(
+            f"{settings.art_format}|{settings.art_quality}|{settings.art_density}|{DEFAULT_ART_SIZE}".encode("utf-8")
+        )
+        # compiled static assets, inlined or referenced by content hash
+        snapshot = STATIC_PATH / COMPILED_DIR / SNAPSHOT_NAME
+        if snapshot.is_file():
+            digest.update(snapshot.read_bytes())
+        # embedded font subsets replace remote imports
+        digest.update(b"fonts" if fonts is not None else b"")
+        self.fingerprint = digest.hexdigest()[:8]
+        # per theme class, digested on first use so cold starts only import the themes they serve
+        self.theme_digests: Dict[Type[BaseTheme], str] = {}
+
+    def template_for(self, config: WidgetConfig, adapter: OutputAdapter) -> jinja2.Template:
+        """pick the theme's template for an output adapter"""
+        key = (config.theme, adapter.native)
+        template = self.templates.get(key)
+        if template is None:
+            theme = ThemeRegistry.get_theme(config.theme, ThemeStyle.LIGHT)
+            template = self.env.get_template(theme.native_template_name if adapter.native else theme.template_name)
+            self.templates[key] = template
+        return template
+
+    def supports_native(self, config: WidgetConfig) -> bool:
+        """whether the configured theme can render as pure svg"""
+        return ThemeRegistry.get_theme(config.theme, ThemeStyle.LIGHT).native_template_name is not None
+
+    def asset_src(self, name: str, config: WidgetConfig) -> str:
+        """reference a static svg as a data uri, or by content-hashed url in external mode"""
+        if config.assets == AssetMode.EXTERNAL:
+            try:
+                return asset_url(name)
+            except OSError:
+                # missing files keep the built-in fallback drawings
+                pass
+        return f"data:image/svg+xml;base64,{self.inline_assets[name]()}"
+
+    def cache_key(self, adapter: OutputAdapter, track: Track, config: WidgetConfig) -> Tuple[str, ...]:
+        """build render cache key from everything that affects the output"""
+        return (
+            adapter.name,
+            track["id"],
+            config.theme.value,
+            config.style.value,
+            # colors arrive canonicalized, one spelling per color
+            config.color or "",
+            config.eq_color,
+            config.assets.value,
+            "live" if config.live else "",
+        )
+
+    def theme_digest(self, theme: ThemeType) -> str:
+        """digest of a theme's code, precomputed specs and bundled font files"""
+        theme_class = ThemeRegistry.theme_class(theme)
+        cached = self.theme_digests.get(theme_class)
+        if cached is not None:
+            return cached
+
+        digest = hashlib.sha1(Path(inspect.getfile(theme_class)).read_bytes())
+        for style in ThemeStyle:
+            instance = ThemeRegistry.get_theme(theme, style)
+            digest.update(json.dumps(dict(instance.spec), sort_keys=True).encode("utf-8"))
+        if self.fonts is not None and instance.font:
+            for face in BUNDLED_FONTS.get(instance.font, ()):
+                path = self.fonts.fonts_dir / face.filename
+                if path.is_file():
+                    digest.update(path.read_bytes())
+        cached = self.theme_digests[theme_class] = digest.hexdigest()[:8]
+        return cached
+
+    def etag_for(self, adapter: OutputAdapter, track: Track, config: WidgetConfig) -> str:
+        """derive strong etag without rendering"""
+        raw = "|".join((self.fingerprint, self.theme_digest(config.theme)) + self.cache_key(adapter, track, config))
+        return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+    def cached(self, track: Track, config: WidgetConfig, adapter: OutputAdapter) -> Optional[RenderedWidget]:
+        """get a previous render without rendering"""
+        return self.cache.get(self.cache_key(adapter, track, config))
+
+    async def render(self, track: Track, config: WidgetConfig, adapter: OutputAdapter) -> RenderedWidget:
+        """render widget through the output adapter, reusing cached output"""
+        key = self.cache_key(adapter, track, config)
+        widget = self.cache.get(key)
+        if widget is None:
+            start = time.perf_counter()
+            template = self.template_for(config, adapter)
+            context, cacheable = await self.build_context(track, config)
+            with timed("template-render"):
+                content = template.render(context)
+            RENDER_SECONDS.observe(time.perf_counter() - start, template.name)
+            widget = RenderedWidget(content, self.etag_for(adapter, track, config), adapter.media_type,
+                                    cacheable=cacheable)
+            if cacheable:
+                self.cache.set(key, widget)
+        return widget
+
+    async def render_many(self, track: Track,
+                          variants: List[Tuple[WidgetConfig, OutputAdapter]]) -> List[RenderedWidget]:
+        """render several variants of one track concurrently, sharing the cover download"""
+        return list(await asyncio.gather(*(self.render(track, config, adapter) for config, adapter in variants)))
+
+    async def stream(self, track: Track, config: WidgetConfig, adapter: OutputAdapter,
+                     encoding: Optional[str]) -> Tuple[bool, AsyncIterator[bytes]]:
+        """build the render context, returning whether the result is cacheable and its body chunks"""
+        start = time.perf_counter()
+        template = self.template_for(config, adapter)
+        context, cacheable = await self.build_context(track, config)
+        chunks = self._generate(track, config, adapter, encoding, template, context, cacheable, start)
+        # produce the first chunk before headers go out, so server-timing carries its render and compress
+        # stages, later chunks only reach the access log
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = b""
+        return cacheable, prepend(first, chunks)
+
+    async def _generate(self, track: Track, config: WidgetConfig, adapter: OutputAdapter,
+                        encoding: Optional[str], template: jinja2.Template, context: Dict[str, Any],
+                        cacheable: bool, start: float) -> AsyncIterator[bytes]:
+        """render widget in chunks as the template generates them, caching the finished body"""
+        coder = Compressor(encoding, self.gzip_level, self.brotli_quality) if encoding else None
+
+        parts: List[str] = []
+        encoded: List[bytes] = []
+        # time spent waiting on the client between chunks is not render time
+        busy, tick = 0.0, start
+        generated = coalesce(template.generate(context))
+        while True:
+            with timed("template-render"):
+                part = next(generated, None)
+            if part is None:
+                break
+            parts.append(part)
+            chunk = part.encode("utf-8")
+            if coder is not None:
+                with timed("compress"):
+                    chunk = await asyncio.to_thread(coder.compress, chunk)
+                encoded.append(chunk)
+            busy += time.perf_counter() - tick
+            if chunk:
+                yield chunk
+            tick = time.perf_counter()
+        # brotli does most of its work when the stream is finished
+        tail = b""
+        if coder is not None:
+            with timed("compress"):
+                tail = await asyncio.to_thread(coder.flush)
+        busy += time.perf_counter() - tick
+        RENDER_SECONDS.observe(busy, template.name)
+
+        if cacheable:
+            widget = RenderedWidget("".join(parts), self.etag_for(adapter, track, config), adapter.media_type)
+            if encoding:
+                widget.encoded[encoding] = b"".join(encoded) + tail
+            self.cache.set(self.cache_key(adapter, track, config), widget)
+        if tail:
+            yield tail
+
+    async def body_for(self, widget: RenderedWidget, encoding: Optional[str]) -> bytes:
+        """get widget body in a content-coding, compressing at most once per cached render"""
+        if encoding is None:
+            return widget.content.encode("utf-8")
+        body = widget.encoded.get(encoding)
+        if body is None:
+            # high compression levels take milliseconds on large payloads, keep them off the loop
+            with timed("compress"):
+                body = await asyncio.to_thread(
+                    compress, widget.content.encode("utf-8"), encoding, self.gzip_level, self.brotli_quality
+                )
+            widget.encoded[encoding] = body
+        return body
+
+    async def build_context(self, track: Track, config: WidgetConfig) -> Tuple[Dict[str, Any], bool]:
+        """build template data once, letting the theme update it in place, and whether the render is cacheable"""
+        theme = ThemeRegistry.get_theme(config.theme, config.style, config.color)
+
+        # album art sized for the theme's display box
+        album_image = (await self.encoder.encode_album_art(track["album_images"], theme.album_art_size)
+                       if track["album_images"] else track["album_image"])
+        # a failed cover download renders the placeholder, which must not stand in for the track later
+        cacheable = album_image is not None
+        if album_image is None:
+            album_image = self.encoder.get_default_image()
+
+        data = self.rendering_service.prepare_rendering_data(
+            track, config, self.asset_src("spotify.svg", config), album_image
+        )
+
+        # add theme-specific assets
+        if config.theme == ThemeType.VINYL:
+            data["vinyl_svg"] = self.asset_src("vinyl.svg", config)
+            data["vinyl_needle_svg"] = self.asset_src("vinyl-needle.svg", config)
+        
+        # embed only the glyphs this widget draws, templates fall back to remote css without it
+        data["font_face_css"] = None
+        if theme.font and self.fonts is not None:
+            text = f"{track['name']}{track['artist']}"
+            text = f"{text.upper() if theme.font_uppercase else text}{theme.font_labels}"
+            with timed("font-subset"):
+                data["font_face_css"] = await self.fonts.font_face_css(theme.font, text)
+
+        with timed("theme-transform"):
+            return theme.transform_data(data), cacheable
+
+
+@lru_cache
+def get_template_env() -> jinja2.Environment:
+    """provide shared jinja environment"""
+    settings = get_settings()
+    return create_environment(TEMPLATES_PATH, settings.minify_templates, settings.template_cache_dir or None)
+
+
+@lru_cache
+def get_renderer() -> WidgetRenderer:
+    """provide app-scoped widget renderer"""
+    settings = get_settings()
+    return WidgetRenderer(
+        get_template_env(),
+        get_encoder(),
+        WidgetRenderingService(VisualizationService()),
+        settings.render_cache_size,
+        available_encodings() if settings.compression else (),
+        settings.gzip_level,
+        settings.brotli_quality,
+        get_font_subsetter() if settings.embed_fonts else None
+    )
@@ -0,0 +1,174 @@
+import argparse
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import jinja2
+
+from app.render.text import ellipsize
+
+# jinja tags are copied verbatim, only the literal text between them is minified
+JINJA_TAG = re.compile(r"({{.*?}}|{%.*?%}|{#.*?#})", re.DOTALL)
+HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+# elements whose text is minified as css, or copied verbatim because whitespace in them is content or code
+BLOCK_TAG = re.compile(r"(</?(?:style|script|pre|textarea)\b[^>]*>)", re.IGNORECASE)
+VERBATIM = ("script", "pre", "textarea")
+# css comments, quoted strings (possibly cut short by a jinja tag) and the plain runs between them
+CSS_TOKEN = re.compile(r"""/\*.*?\*/|(?P<quote>["'])(?:\\.|(?!(?P=quote))[^\\])*(?P<close>(?P=quote))?|[^"'/]+|/""",
+                       re.DOTALL)
+CSS_STRING_TAIL = {quote: re.compile(rf"(?:\\.|[^{quote}\\])*{quote}", re.DOTALL) for quote in "'\""}
+WHITESPACE = re.compile(r"\s+")
+# whitespace next to these css punctuators never changes meaning
+CSS_PUNCTUATION = re.compile(r"\s*([{};])\s*")
+# a css brace must not fuse with what follows into a jinja delimiter
+FUSED_DELIMITER = re.compile(r"{(?=[{%#])")
+
+
+def _minify_css_run(run: str) -> str:
+    """collapse whitespace in css outside strings and comments"""
+    return FUSED_DELIMITER.sub("{ ", CSS_PUNCTUATION.sub(r"\1", WHITESPACE.sub(" ", run)))
+
+
+def _minify_css(text: str, quote: str) -> Tuple[str, str]:
+    """minify css text, keeping quoted strings as written and tracking a string left open by a jinja tag"""
+    out = []
+    if quote:
+        tail = CSS_STRING_TAIL[quote].match(text)
+        if tail is None:
+            return text, quote
+        out.append(tail.group())
+        text = text[tail.end():]
+        quote = ""
+
+    run = []
+    for token in CSS_TOKEN.finditer(text):
+        value = token.group()
+        if value.startswith("/*"):
+            continue
+        if token.group("quote"):
+            out.append(_minify_css_run("".join(run)))
+            out.append(value)
+            run = []
+            if token.group("close") is None:
+                quote = token.group("quote")
+        else:
+            run.append(value)
+    out.append(_minify_css_run("".join(run)))
+    return "".join(out), quote
+
+
+def _minify_text(text: str, block: str, quote: str) -> Tuple[str, str, str]:
+    """minify literal template text, tracking the enclosing style or verbatim block and any open css string"""
+    out = []
+    for part in BLOCK_TAG.split(text):
+        if BLOCK_TAG.fullmatch(part):
+            name = part.strip("</>").split()[0].lower()
+            if not block and not part.startswith("</"):
+                block = name
+                out.append(part)
+                continue
+            if block == name and part.startswith("</"):
+                block, quote = "", ""
+                out.append(part)
+                continue
+        if block in VERBATIM:
+            out.append(part)
+        elif block:
+            part, quote = _minify_css(part, quote)
+            out.append(part)
+        else:
+            # runs collapse to one space rather than vanish, so inline layout is unchanged
+            out.append(WHITESPACE.sub(" ", HTML_COMMENT.sub("", part)))
+    return "".join(out), block, quote
+
+
+def minify_template(source: str) -> str:
+    """strip comments and redundant whitespace from svg/xhtml template source"""
+    out = []
+    block = quote = ""
+    for piece in JINJA_TAG.split(source):
+        if piece.startswith("{#"):
+            # template comments render nothing
+            continue
+        if JINJA_TAG.fullmatch(piece):
+            if out and out[-1].endswith("{") and block == "style" and not quote:
+                out.append(" ")
+            out.append(piece)
+        else:
+            text, block, quote = _minify_text(piece, block, quote)
+            out.append(text)
+    return "".join(out).strip()
+
+
+class MinifyingLoader(jinja2.FileSystemLoader):
+    """filesystem loader serving minified template source"""
+
+    def get_source(self, environment: jinja2.Environment, template: str) -> Tuple[str, str, Callable[[], bool]]:
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_template(source), filename, uptodate
+
+
+def create_environment(templates_dir: Path, minify: bool = True,
+                       bytecode_dir: Optional[str] = None) -> jinja2.Environment:
+    """build jinja environment with optional minification and persistent bytecode cache"""
+    loader_class = MinifyingLoader if minify else jinja2.FileSystemLoader
+    bytecode_cache = None
+    if bytecode_dir:
+        try:
+            Path(bytecode_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_dir)
+        except OSError:
+            # read-only filesystem, compile in memory
+            pass
+    env = jinja2.Environment(
+        loader=loader_class(str(templates_dir)),
+        # native svg templates are xml documents and need escaping too
+        autoescape=jinja2.select_autoescape(["html", "htm", "xml", "svg"]),
+        bytecode_cache=bytecode_cache
+    )
+    env.filters["ellipsize"] = ellipsize
+    return env
+
+
+def precompile(env: jinja2.Environment) -> List[Dict]:
+    """compile every template into the environment's caches, reporting size reduction"""
+    rows = []
+    for name in env.list_templates(extensions=["html", "svg"]):
+        raw, _, _ = jinja2.FileSystemLoader.get_source(env.loader, env, name)
+        minified, _, _ = env.loader.get_source(env, name)
+        env.get_template(name)
+        rows.append({"template": name, "before": len(raw.encode("utf-8")), "after": len(minified.encode("utf-8"))})
+    return rows
+
+
+def format_report(rows: List[Dict]) -> str:
+    """format per-template size reduction as an aligned table"""
+    lines = [f"{'template':<24}{'before':>10}{'after':>10}{'saved':>8}"]
+    for row in rows:
+        saved = 1 - row["after"] / row["before"] if row["before"] else 0.0
+        lines.append(f"{row['template']:<24}{row['before']:>10,}{row['after']:>10,}{saved:>8.0%}")
+    before = sum(row["before"] for row in rows)
+    after = sum(row["after"] for row in rows)
+    lines.append(f"{'total':<24}{before:>10,}{after:>10,}{1 - after / before if before else 0.0:>8.0%}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """minify and precompile templates from the command line"""
+    from app.config import TEMPLATES_PATH, get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="minify and precompile jinja templates")
+    parser.add_argument("--bytecode-dir", default=settings.template_cache_dir,
+                        help="directory for the persistent bytecode cache (default: TEMPLATE_CACHE_DIR)")
+    parser.add_argument("--no-minify", action="store_true", help="only precompile")
+    args = parser.parse_args()
+
+    env = create_environment(TEMPLATES_PATH, not args.no_minify, args.bytecode_dir or None)
+    print(format_report(precompile(env)))
+    if env.bytecode_cache is not None:
+        print(f"bytecode written to {args.bytecode_dir}")
+
+
+if __name__ == "__main__":
+    main()
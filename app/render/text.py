@@ -0,0 +1,104 @@
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+ELLIPSIS = "…"
+
+
+class WidthTable:
+    """per-character advance widths of one font, in em"""
+
+    def __init__(self, advances: Dict[int, float], default: float, wide: float = 1.0):
+        """initialize with advances by codepoint and fallbacks for unmapped characters"""
+        self.advances = advances
+        self.default = default
+        self.wide = wide
+
+    def advance(self, char: str) -> float:
+        """advance width of one character in em"""
+        width = self.advances.get(ord(char))
+        if width is not None:
+            return width
+        if unicodedata.combining(char):
+            return 0.0
+        # unmapped cjk and emoji take a full em in every fallback font
+        return self.wide if unicodedata.east_asian_width(char) in ("W", "F") else self.default
+
+    def width(self, text: str, size: float) -> float:
+        """rendered width of text in px at a font size"""
+        return sum(self.advance(char) for char in text) * size
+
+    def ellipsize(self, text: str, size: float, max_width: float) -> str:
+        """truncate text with an ellipsis so it fits max_width px"""
+        if self.width(text, size) <= max_width:
+            return text
+        budget = max_width / size - self.advance(ELLIPSIS)
+        used = 0.0
+        for i, char in enumerate(text):
+            used += self.advance(char)
+            if used > budget:
+                return text[:i].rstrip() + ELLIPSIS
+        return text
+
+
+def monospace_table(advance: float) -> WidthTable:
+    """width table for a font whose narrow glyphs share one advance"""
+    return WidthTable({}, advance)
+
+
+def load_width_table(path: Path) -> Optional[WidthTable]:
+    """read advance widths from a font file's horizontal metrics"""
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+    try:
+        font = TTFont(str(path), lazy=True)
+    except OSError:
+        return None
+
+    units = font["head"].unitsPerEm
+    metrics = font["hmtx"].metrics
+    advances = {
+        codepoint: metrics[glyph][0] / units
+        for codepoint, glyph in font.getBestCmap().items()
+        if glyph in metrics
+    }
+    # unmapped narrow characters fall back to the width of a lowercase letter
+    return WidthTable(advances, advances.get(ord("n"), 0.55))
+
+
+# advance (em) per font when its file or fonttools is unavailable, or for fonts without a file
+FALLBACK_ADVANCES = {
+    "sans": 0.6,
+    "sans-bold": 0.65,
+    # system monospace stack: plex mono, menlo, liberation mono and courier new are 0.6,
+    # dejavu sans mono is the widest at 0.602 and consolas the narrowest at 0.55
+    "system-mono": 0.602,
+}
+
+# fonts measured from bundled files
+FONT_FILES = {
+    "sans": "DejaVuSans.ttf",
+    "sans-bold": "DejaVuSans-Bold.ttf",
+    "retro-pixel": "WidgetPixel-Regular.ttf",
+}
+
+
+@lru_cache(maxsize=8)
+def get_width_table(font: str) -> WidthTable:
+    """provide cached width table for a named font"""
+    from app.utils.fonts import FONTS_DIR
+
+    filename = FONT_FILES.get(font)
+    if filename and (FONTS_DIR / filename).is_file():
+        table = load_width_table(FONTS_DIR / filename)
+        if table is not None:
+            return table
+    return monospace_table(FALLBACK_ADVANCES.get(font, 0.6))
+
+
+def ellipsize(text: str, font: str, size: float, max_width: float) -> str:
+    """jinja filter: truncate text to fit a box in the named font"""
+    return get_width_table(font).ellipsize(str(text), size, max_width)
@@ -1,45 +1,95 @@
-from typing import Dict, Type, Optional
-from functools import lru_cache
+import importlib
+from typing import Dict, Tuple, Type, Optional
+from app.config import get_settings
 from app.themes.base import BaseTheme
-from app.themes.default import DefaultTheme
-from app.themes.vinyl import VinylTheme
-from app.themes.ipod import IpodTheme
-from app.themes.retro import RetroTheme
-from app.themes.windows98 import Windows98Theme
-from app.themes.frutiger_aero import FrutigerAeroTheme
-from app.themes.macintosh import MacintoshTheme
-from app.themes.windowsxp import WindowsXPTheme  # Import the new theme
-from app.domain.models import ThemeType, ThemeStyle
+from app.domain.models import ThemeType, ThemeStyle, normalize_color
+from app.utils.cache import LRUCache
 
 
 class ThemeRegistry:
     """registry and factory for widget themes"""
     
-    # theme class registry
-    _themes: Dict[ThemeType, Type[BaseTheme]] = {
-        ThemeType.DEFAULT: DefaultTheme,
-        ThemeType.VINYL: VinylTheme,
-        ThemeType.IPOD: IpodTheme,
-        ThemeType.RETRO: RetroTheme,
-        ThemeType.WINDOWS98: Windows98Theme,
-        ThemeType.FRUTIGER_AERO: FrutigerAeroTheme,
-        ThemeType.MACINTOSH: MacintoshTheme,
-        ThemeType.WINDOWSXP: WindowsXPTheme,  # Register the new theme
+    # theme modules, imported on first use so cold starts only load the themes they serve
+    _theme_paths: Dict[ThemeType, str] = {
+        ThemeType.DEFAULT: "app.themes.default:DefaultTheme",
+        ThemeType.VINYL: "app.themes.vinyl:VinylTheme",
+        ThemeType.IPOD: "app.themes.ipod:IpodTheme",
+        ThemeType.RETRO: "app.themes.retro:RetroTheme",
+        ThemeType.WINDOWS98: "app.themes.windows98:Windows98Theme",
+        ThemeType.FRUTIGER_AERO: "app.themes.frutiger_aero:FrutigerAeroTheme",
+        ThemeType.MACINTOSH: "app.themes.macintosh:MacintoshTheme",
+        ThemeType.WINDOWSXP: "app.themes.windowsxp:WindowsXPTheme",
     }
     
+    # theme class registry, filled from the paths above or by register_theme
+    _themes: Dict[ThemeType, Type[BaseTheme]] = {}
+    
+    # uncolored theme per (theme, style), built on first use and never evicted
+    _base: Dict[Tuple[ThemeType, ThemeStyle], BaseTheme] = {}
+    # custom-colored variants, bounded so arbitrary query colors cannot flood memory
+    _variants: Optional[LRUCache[BaseTheme]] = None
+    # base lookups, reported next to the variant cache's own counters
+    base_hits = 0
+    base_misses = 0
+    
     @classmethod
-    @lru_cache(maxsize=20)  # increased for color variations
     def get_theme(cls, theme: ThemeType, style: ThemeStyle, color: Optional[str] = None) -> BaseTheme:
-        """get appropriate theme instance with caching"""
-        theme_class = cls._themes.get(theme, DefaultTheme)
-        return theme_class(style, color)
+        """get shared theme instance for a theme, style and optional color"""
+        base = cls._base.get((theme, style))
+        if base is None:
+            cls.base_misses += 1
+            base = cls._base[(theme, style)] = cls._create(theme, style)
+        else:
+            cls.base_hits += 1
+        
+        color = normalize_color(color)
+        if color is None:
+            return base
+        
+        variants = cls.variants()
+        key = (theme, style, color)
+        variant = variants.get(key)
+        if variant is None:
+            variant = cls._create(theme, style, color)
+            variants.set(key, variant)
+        return variant
+    
+    @classmethod
+    def variants(cls) -> LRUCache[BaseTheme]:
+        """get the bounded cache of colored theme variants"""
+        if cls._variants is None:
+            cls._variants = LRUCache(maxsize=get_settings().theme_cache_size)
+        return cls._variants
+    
+    @classmethod
+    def base_count(cls) -> int:
+        """number of uncolored theme instances built so far"""
+        return len(cls._base)
+    
+    @classmethod
+    def theme_class(cls, theme: ThemeType) -> Type[BaseTheme]:
+        """get theme class, importing its module on first use"""
+        theme_class = cls._themes.get(theme)
+        if theme_class is None:
+            module, name = cls._theme_paths.get(theme, cls._theme_paths[ThemeType.DEFAULT]).split(":")
+            theme_class = cls._themes[theme] = getattr(importlib.import_module(module), name)
+        return theme_class
+    
+    @classmethod
+    def _create(cls, theme: ThemeType, style: ThemeStyle, color: Optional[str] = None) -> BaseTheme:
+        """build a theme instance, precomputing its css"""
+        return cls.theme_class(theme)(style, color)
     
     @classmethod
     def register_theme(cls, theme_type: ThemeType, theme_class: Type[BaseTheme]) -> None:
         """register a new theme type"""
         cls._themes[theme_type] = theme_class
+        # drop instances built from the replaced class
+        for key in [key for key in cls._base if key[0] == theme_type]:
+            del cls._base[key]
+        cls.variants().clear()
     
     @classmethod
     def available_themes(cls) -> list[str]:
         """get list of available theme names"""
-        return [t.value for t in cls._themes.keys()]
\ No newline at end of file
+        return [t.value for t in {**cls._theme_paths, **cls._themes}]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TypedDict, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, TypedDict, Optional
 from app.domain.models import ThemeStyle
+from app.utils.images import DEFAULT_ART_SIZE
 
 
 class ThemeCSS(TypedDict):
@@ -21,6 +23,8 @@ class BaseTheme(ABC):
         self.style = style
         # ensure color has proper hex format with leading #
         self.color = f"#{color}" if color and not color.startswith('#') else color
+        # every css variable is computed once, instances are shared between requests
+        self.spec: Mapping[str, str] = MappingProxyType(dict(self.build_css()))
     
     @property
     def name(self) -> str:
@@ -32,17 +36,31 @@ class BaseTheme(ABC):
         """check if theme is in dark mode"""
         return self.style == ThemeStyle.DARK
     
-    @property
     @abstractmethod
-    def css(self) -> ThemeCSS:
-        """get theme css variables"""
+    def build_css(self) -> ThemeCSS:
+        """compute theme css variables, once per instance"""
         pass
     
+    @property
+    def css(self) -> Dict[str, str]:
+        """get a mutable copy of the precomputed css variables"""
+        return dict(self.spec)
+    
     @abstractmethod
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """apply theme-specific transformations to template data"""
+        """apply theme-specific transformations to template data in place"""
         pass
     
+    @property
+    def template_name(self) -> str:
+        """jinja template used to render this theme"""
+        return "widget.html"
+    
+    @property
+    def native_template_name(self) -> Optional[str]:
+        """pure svg template without foreignObject, if the theme has one"""
+        return None
+    
     @property
     def supports_equalizer(self) -> bool:
         """whether theme supports equalizer visualization"""
@@ -53,6 +71,26 @@ class BaseTheme(ABC):
         """whether theme supports album art spinning"""
         return True
     
+    @property
+    def album_art_size(self) -> int:
+        """css box (px) the album cover is displayed at"""
+        return DEFAULT_ART_SIZE
+    
+    @property
+    def font(self) -> Optional[str]:
+        """bundled font set embedded as a glyph subset, if any"""
+        return None
+    
+    @property
+    def font_uppercase(self) -> bool:
+        """whether the template draws track text in capitals, so the subset needs those glyphs"""
+        return False
+    
+    @property
+    def font_labels(self) -> str:
+        """fixed text the template draws in the bundled font"""
+        return ""
+    
     def _dark_or_light(self, dark_value: str, light_value: str) -> str:
         """helper to get style-appropriate value"""
         return dark_value if self.is_dark else light_value
\ No newline at end of file
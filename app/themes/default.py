@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.themes.base import BaseTheme, ThemeCSS
 from app.domain.models import ThemeStyle
 
@@ -6,13 +6,12 @@ from app.domain.models import ThemeStyle
 class DefaultTheme(BaseTheme):
     """default theme with equalizer visualization and blurred background"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get theme css variables"""
         # use custom color if provided, otherwise use default based on style
         bg_color = self.color if self.color else self._dark_or_light("#161B22", "#F6F8FA")
         
-        return ThemeCSS(
+        css = ThemeCSS(
             background_color=bg_color,
             title_color="#FFFFFF",  # always white text for visibility
             subtitle_color=self._dark_or_light("#BBBBBB", "#DDDDDD"),  # light gray for subtitle
@@ -20,13 +19,6 @@ class DefaultTheme(BaseTheme):
             container_padding="20px",
             text_font="-apple-system, BlinkMacSystemFont, Segoe UI, Helvetica, Arial, sans-serif"
         )
-    
-    def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """apply default theme transformations"""
-        result = data.copy()
-        
-        # add theme-specific css variables
-        result["css"] = self.css
         
         # add overlay color for the blurred background effect
         if self.color:
@@ -36,9 +28,18 @@ class DefaultTheme(BaseTheme):
             r = int(color[0:2], 16)
             g = int(color[2:4], 16)
             b = int(color[4:6], 16)
-            result["css"]["overlay_color"] = f"rgba({r}, {g}, {b}, 0.6)"
+            css["overlay_color"] = f"rgba({r}, {g}, {b}, 0.6)"
         else:
-            result["css"]["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.6)", "rgba(0,0,0,0.25)")
+            css["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.6)", "rgba(0,0,0,0.25)")
+        
+        return css
+    
+    def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """apply default theme transformations"""
+        result = data
+        
+        # add theme-specific css variables
+        result["css"] = self.css
         
         # update album radius if spinning
         if data.get("spin"):
@@ -47,4 +48,9 @@ class DefaultTheme(BaseTheme):
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        return result
\ No newline at end of file
+        return result
+    
+    @property
+    def native_template_name(self) -> Optional[str]:
+        """default theme pure svg template"""
+        return "native/widget.svg"
@@ -1,18 +1,20 @@
+import logging
 from typing import Dict, Any
 from app.themes.base import BaseTheme, ThemeCSS
 from app.domain.models import ThemeStyle
 
+logger = logging.getLogger(__name__)
+
 
 class IpodTheme(BaseTheme):
     """ipod-inspired theme with circular control panel design"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get ipod theme css variables"""
         # use custom color if provided, otherwise use default
         bg_color = self.color if self.color else "#e2e2e3"
         
-        return ThemeCSS(
+        css = ThemeCSS(
             background_color=bg_color,  # custom color affects the ipod body
             title_color="#555555",
             subtitle_color="#666666",
@@ -20,10 +22,21 @@ class IpodTheme(BaseTheme):
             container_padding="15px",
             text_font="-apple-system, BlinkMacSystemFont, Segoe UI, Helvetica, Arial, sans-serif"
         )
+        
+        # add ipod-specific styling variables
+        css["controls_bg"] = self._dark_or_light("rgba(49,49,50,1)", "rgba(255,255,255,1)")
+        css["controls_border"] = "#e6e6e6"
+        css["controls_shadow"] = "0 4px 10px rgba(0, 0, 0, 0.05)"
+        css["icon_color"] = "#b6b4b3"
+        css["album_border_color"] = "#000000"
+        css["album_border_width"] = "4px"
+        css["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.6)", "rgba(0,0,0,0.45)")
+        
+        return css
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply ipod theme transformations"""
-        result = data.copy()
+        result = data
         
         # add theme-specific css variables
         result["css"] = self.css
@@ -35,17 +48,7 @@ class IpodTheme(BaseTheme):
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        # add ipod-specific styling variables
-        result["css"]["controls_bg"] = self._dark_or_light("rgba(49,49,50,1)", "rgba(255,255,255,1)")
-        result["css"]["controls_border"] = "#e6e6e6"
-        result["css"]["controls_shadow"] = "0 4px 10px rgba(0, 0, 0, 0.05)"
-        result["css"]["icon_color"] = "#b6b4b3"
-        result["css"]["album_border_color"] = "#000000"
-        result["css"]["album_border_width"] = "4px"
-        result["css"]["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.6)", "rgba(0,0,0,0.45)")
-        
-        # For debugging - log what color is being used
-        print(f"IpodTheme using background color: {result['css']['background_color']}")
+        logger.debug("ipod theme background color %s", result["css"]["background_color"])
         
         return result
     
@@ -57,4 +60,14 @@ class IpodTheme(BaseTheme):
     @property
     def supports_spin(self) -> bool:
         """ipod theme doesn't support album art spinning"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """ipod theme displays the album cover at 100px"""
+        return 100
+    
+    @property
+    def template_name(self) -> str:
+        """ipod theme template"""
+        return "ipod.html"
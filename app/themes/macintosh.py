@@ -6,8 +6,7 @@ from app.domain.models import ThemeStyle
 class MacintoshTheme(BaseTheme):
     """macintosh-inspired theme with classic apple UI design from 1983"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get macintosh theme css variables"""
         return ThemeCSS(
             background_color="#E8E8E8",  # Light gray background
@@ -20,7 +19,7 @@ class MacintoshTheme(BaseTheme):
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply macintosh theme transformations"""
-        result = data.copy()
+        result = data
         
         # add theme-specific css variables
         result["css"] = self.css
@@ -32,9 +31,6 @@ class MacintoshTheme(BaseTheme):
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        # specify custom template
-        result["template_name"] = "macintosh.html"
-        
         return result
     
     @property
@@ -45,4 +41,14 @@ class MacintoshTheme(BaseTheme):
     @property
     def supports_spin(self) -> bool:
         """macintosh theme doesn't support album art spinning"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """macintosh theme displays the album cover at 100px"""
+        return 100
+    
+    @property
+    def template_name(self) -> str:
+        """macintosh theme template"""
+        return "macintosh.html"
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.themes.base import BaseTheme, ThemeCSS
 from app.domain.models import ThemeStyle
 
@@ -6,10 +6,9 @@ from app.domain.models import ThemeStyle
 class RetroTheme(BaseTheme):
     """retro audio player-inspired theme with pixel-perfect design and static indicators"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get retro theme css variables with dotgothic16 font"""
-        return ThemeCSS(
+        css = ThemeCSS(
             background_color=self._dark_or_light("#232731", "#c6c6c6"),
             title_color=self._dark_or_light("#4df3ad", "#2eb532"),  # green text
             subtitle_color=self._dark_or_light("#3dd38d", "#269a2a"),  # lighter green text
@@ -17,38 +16,37 @@ class RetroTheme(BaseTheme):
             container_padding="15px",
             text_font="sans-serif, -apple-system, BlinkMacSystemFont, Segoe UI, Helvetica, Arial"
         )
+        
+        # border styling for 3D effect - different for dark and light modes
+        css["border_top_color"] = self._dark_or_light("#181b22", "#9a9a9a")
+        css["border_left_color"] = self._dark_or_light("#181b22", "#9a9a9a")
+        css["border_right_color"] = self._dark_or_light("#40495f", "white")
+        css["border_bottom_color"] = self._dark_or_light("#40495f", "white")
+        css["button_border"] = self._dark_or_light("#12141c", "#9a9a9a")
+        
+        # retro-specific css variables for enhanced design
+        css["panel_bg_color"] = self._dark_or_light("#10242f", "#041e2e")
+        css["button_bg_color"] = self._dark_or_light("#303644", "#e1e1e1")
+        css["button_color"] = self._dark_or_light("#4cf3ad", "#2fb532")
+        css["equalizer_bar_color"] = self._dark_or_light("#4df3ad", "#0100fb")
+        css["equalizer_progress_color"] = self._dark_or_light("#242424", "#181a29")
+        css["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.7)", "rgba(0,0,0,0.5)")
+        
+        return css
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply retro theme transformations with 8-bit styling and improved button design"""
-        result = data.copy()
+        result = data
         
         # add theme-specific css variables
         result["css"] = self.css
         
-        # border styling for 3D effect - different for dark and light modes
-        result["css"]["border_top_color"] = self._dark_or_light("#181b22", "#9a9a9a")
-        result["css"]["border_left_color"] = self._dark_or_light("#181b22", "#9a9a9a")
-        result["css"]["border_right_color"] = self._dark_or_light("#40495f", "white")
-        result["css"]["border_bottom_color"] = self._dark_or_light("#40495f", "white")
-        result["css"]["button_border"] = self._dark_or_light("#12141c", "#9a9a9a")
-        
-        # retro-specific css variables for enhanced design
-        result["css"]["panel_bg_color"] = self._dark_or_light("#10242f", "#041e2e")
-        result["css"]["button_bg_color"] = self._dark_or_light("#303644", "#e1e1e1")
-        result["css"]["button_color"] = self._dark_or_light("#4cf3ad", "#2fb532")
-        result["css"]["equalizer_bar_color"] = self._dark_or_light("#4df3ad", "#0100fb")
-        result["css"]["equalizer_progress_color"] = self._dark_or_light("#242424", "#181a29")
-        result["css"]["overlay_color"] = self._dark_or_light("rgba(0,0,0,0.7)", "rgba(0,0,0,0.5)")
-        
         # disable standard equalizer since we're using static dots
         result["show_equalizer"] = False
         
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        # use a custom template for retro theme
-        result["template_name"] = "retro.html"
-        
         return result
     
     @property
@@ -59,4 +57,35 @@ class RetroTheme(BaseTheme):
     @property
     def supports_spin(self) -> bool:
         """retro theme doesn't need spinning elements"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """retro theme displays the album cover at 60px"""
+        return 60
+    
+    @property
+    def template_name(self) -> str:
+        """retro theme template"""
+        return "retro.html"
+    
+    @property
+    def native_template_name(self) -> Optional[str]:
+        """retro theme pure svg template"""
+        return "native/retro.svg"
+    
+    @property
+    def font(self) -> Optional[str]:
+        """retro theme uses the bundled pixel font"""
+        return "retro-pixel"
+    
+    @property
+    def font_uppercase(self) -> bool:
+        """track name and artist are shown in capitals"""
+        return True
+    
+    @property
+    def font_labels(self) -> str:
+        """now playing header"""
+        return "● NOW PLAYING"
+
@@ -6,8 +6,7 @@ from app.domain.models import ThemeStyle
 class VinylTheme(BaseTheme):
     """vinyl record-inspired theme with blurred album art background"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get vinyl theme css variables"""
         # use custom color if provided, otherwise use default based on style
         bg_color = self.color if self.color else self._dark_or_light("#161B22", "#F6F8FA")
@@ -49,7 +48,7 @@ class VinylTheme(BaseTheme):
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply vinyl theme transformations"""
-        result = data.copy()
+        result = data
         
         # vinyl theme forces spin and disables equalizer
         result["spin"] = True
@@ -60,12 +59,19 @@ class VinylTheme(BaseTheme):
         result["theme_name"] = self.name
         result["use_vinyl_svg"] = True
         
-        # explicitly set template name to be used in main.py
-        result["template_name"] = "vinyl.html"
-        
         return result
     
     @property
     def supports_equalizer(self) -> bool:
         """vinyl theme doesn't use equalizer"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """vinyl theme displays the album cover at 88px"""
+        return 88
+    
+    @property
+    def template_name(self) -> str:
+        """vinyl theme template"""
+        return "vinyl.html"
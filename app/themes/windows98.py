@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.themes.base import BaseTheme, ThemeCSS
 from app.domain.models import ThemeStyle
 
@@ -6,10 +6,9 @@ from app.domain.models import ThemeStyle
 class Windows98Theme(BaseTheme):
     """windows 98-inspired theme with classic cd player ui elements"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get windows 98 theme css variables"""
-        return ThemeCSS(
+        css = ThemeCSS(
             background_color="#C0C0C0",  # silver background
             title_color="#000000",       # black text
             subtitle_color="#000000",    # black text
@@ -17,21 +16,23 @@ class Windows98Theme(BaseTheme):
             container_padding="1px",     # minimal padding
             text_font="'IBM Plex Mono', monospace"  # monospace font
         )
+        
+        # add win98-specific styling variables
+        css["titlebar_bg"] = "linear-gradient(to right, navy, rgb(16, 132, 208))"
+        css["button_face"] = "#C0C0C0"
+        css["button_highlight"] = "#FFFFFF"
+        css["button_shadow"] = "#808080"
+        css["button_dark_shadow"] = "#000000"
+        
+        return css
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply windows 98 theme transformations"""
-        result = data.copy()
+        result = data
         
         # add theme-specific css variables
         result["css"] = self.css
         
-        # add win98-specific styling variables
-        result["css"]["titlebar_bg"] = "linear-gradient(to right, navy, rgb(16, 132, 208))"
-        result["css"]["button_face"] = "#C0C0C0"
-        result["css"]["button_highlight"] = "#FFFFFF"
-        result["css"]["button_shadow"] = "#808080"
-        result["css"]["button_dark_shadow"] = "#000000"
-        
         # disable spinning and standard equalizer
         result["spin"] = False
         result["show_equalizer"] = False
@@ -39,9 +40,6 @@ class Windows98Theme(BaseTheme):
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        # specify custom template
-        result["template_name"] = "windows98.html"
-        
         return result
     
     @property
@@ -52,4 +50,19 @@ class Windows98Theme(BaseTheme):
     @property
     def supports_spin(self) -> bool:
         """windows 98 theme doesn't use spinning album art"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """windows 98 theme displays the album cover at 110px"""
+        return 110
+    
+    @property
+    def template_name(self) -> str:
+        """windows 98 theme template"""
+        return "windows98.html"
+    
+    @property
+    def native_template_name(self) -> Optional[str]:
+        """windows 98 theme pure svg template"""
+        return "native/windows98.svg"
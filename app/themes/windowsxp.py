@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.themes.base import BaseTheme, ThemeCSS
 from app.domain.models import ThemeStyle
 
@@ -6,10 +6,9 @@ from app.domain.models import ThemeStyle
 class WindowsXPTheme(BaseTheme):
     """windows xp media player 11 inspired theme with classic wmp interface"""
     
-    @property
-    def css(self) -> ThemeCSS:
+    def build_css(self) -> ThemeCSS:
         """get windows xp theme css variables"""
-        return ThemeCSS(
+        css = ThemeCSS(
             background_color="#394152",  # base gradient color for the player
             title_color="#FFFFFF",       # white text for the title
             subtitle_color="#CCCCCC",    # light gray for artist name
@@ -17,10 +16,22 @@ class WindowsXPTheme(BaseTheme):
             container_padding="0px",     # no padding for the main container
             text_font="'Tahoma', sans-serif"  # tahoma font as requested
         )
+        
+        # add wmp-specific styling variables
+        css["player_active_white"] = "rgb(239, 247, 255)"
+        css["player_disable_white"] = "rgba(239, 247, 255, 0.3)"
+        css["gradient_top"] = "rgb(0, 0, 0)"
+        css["gradient_middle"] = "rgb(57, 65, 82)"
+        css["gradient_bottom_1"] = "rgb(102, 108, 132)"
+        css["gradient_bottom_2"] = "rgb(17, 20, 25)"
+        css["button_blue"] = "#00109c"
+        css["control_shadow"] = "0 0 5px rgba(0, 82, 198, 0.5)"
+        
+        return css
     
     def transform_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """apply windows xp media player theme transformations"""
-        result = data.copy()
+        result = data
         
         # add theme-specific css variables
         result["css"] = self.css
@@ -32,19 +43,6 @@ class WindowsXPTheme(BaseTheme):
         # add theme name for template logic
         result["theme_name"] = self.name
         
-        # specify custom template
-        result["template_name"] = "windowsxp.html"
-        
-        # add wmp-specific styling variables
-        result["css"]["player_active_white"] = "rgb(239, 247, 255)"
-        result["css"]["player_disable_white"] = "rgba(239, 247, 255, 0.3)"
-        result["css"]["gradient_top"] = "rgb(0, 0, 0)"
-        result["css"]["gradient_middle"] = "rgb(57, 65, 82)"
-        result["css"]["gradient_bottom_1"] = "rgb(102, 108, 132)"
-        result["css"]["gradient_bottom_2"] = "rgb(17, 20, 25)"
-        result["css"]["button_blue"] = "#00109c"
-        result["css"]["control_shadow"] = "0 0 5px rgba(0, 82, 198, 0.5)"
-        
         return result
     
     @property
@@ -55,4 +53,24 @@ class WindowsXPTheme(BaseTheme):
     @property
     def supports_spin(self) -> bool:
         """windows xp theme doesn't use spinning album art"""
-        return False
\ No newline at end of file
+        return False
+    
+    @property
+    def album_art_size(self) -> int:
+        """windows xp theme displays the album cover at 100px"""
+        return 100
+    
+    @property
+    def template_name(self) -> str:
+        """windows xp theme template"""
+        return "windowsxp.html"
+    
+    @property
+    def font(self) -> Optional[str]:
+        """windows xp theme uses a tahoma-like sans"""
+        return "xp-sans"
+    
+    @property
+    def font_labels(self) -> str:
+        """title bar caption"""
+        return "Now Playing"
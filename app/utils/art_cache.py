@@ -0,0 +1,166 @@
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from app.config import get_settings
+
+
+class AlbumArtStore:
+    """app-scoped album art cache bounded by total bytes with optional disk tier"""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None, disk_max_bytes: int = 64 * 1024 * 1024):
+        """initialize with memory byte budget, optional cache directory and its byte budget"""
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._disk_bytes = 0
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir is not None:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                # read-only filesystem, run memory-only
+                self.disk_dir = None
+        if self.disk_dir is not None:
+            # files left by earlier runs count against the budget
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def get(self, key: str) -> Optional[str]:
+        """get encoded image from memory, then disk tier"""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+        value = self._read_disk(key)
+        if value is not None:
+            # promote to memory tier
+            self._store(key, value)
+            self.disk_hits += 1
+            return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """store encoded image in memory and on disk"""
+        self._store(key, value)
+        self._write_disk(key, value)
+
+    def _store(self, key: str, value: str) -> None:
+        """insert into memory tier, evicting least recently used entries over budget"""
+        # entries bigger than the whole budget are never kept in memory
+        if len(value) > self.max_bytes:
+            return
+
+        previous = self._data.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+
+        self._data[key] = value
+        self._bytes += len(value)
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        """map cache key to a stable file name"""
+        return self.disk_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.b64"
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        """read encoded image from disk tier"""
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            value = path.read_text(encoding="ascii")
+            # eviction goes by mtime, so a read marks the file as recently used
+            os.utime(path)
+        except (FileNotFoundError, IOError, ValueError):
+            return None
+        return value
+
+    def _write_disk(self, key: str, value: str) -> None:
+        """write encoded image to disk tier atomically"""
+        if self.disk_dir is None or len(value) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path.write_text(value, encoding="ascii")
+            os.replace(tmp_path, path)
+        except (IOError, OSError):
+            return
+        self._disk_bytes += len(value) - previous
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _disk_entries(self) -> List[Tuple[float, Path, int]]:
+        """mtime, path and size of every file in the disk tier"""
+        entries = []
+        for path in self.disk_dir.glob("*.b64"):
+            try:
+                stat = path.stat()
+            except OSError:
+                # removed by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def _evict_disk(self) -> None:
+        """delete least recently used files until the disk tier fits its budget"""
+        # rescan rather than trust the running total, other processes may share the directory
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+    @property
+    def size_bytes(self) -> int:
+        """total bytes held in memory tier"""
+        return self._bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        """total bytes held in the disk tier"""
+        return self._disk_bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """get cache size and hit/miss counters"""
+        return {
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+@lru_cache
+def get_album_art_store() -> AlbumArtStore:
+    """provide app-scoped album art store"""
+    settings = get_settings()
+    disk_dir = Path(settings.art_cache_dir) if settings.art_cache_dir else None
+    return AlbumArtStore(settings.art_cache_max_bytes, disk_dir, settings.art_cache_disk_max_bytes)
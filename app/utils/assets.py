@@ -0,0 +1,246 @@
+import argparse
+import base64
+import hashlib
+import io
+import json
+import math
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TypedDict
+from app.config import STATIC_PATH
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+HREF = f"{{{XLINK_NS}}}href"
+
+# keep original prefixes when serializing
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# largest css box (px) each asset is displayed at across all templates
+DISPLAY_SIZES: Dict[str, int] = {
+    "vinyl.svg": 138,
+    "vinyl-needle.svg": 160,
+    "spotify.svg": 20,
+}
+
+# attributes with no rendering effect
+DROPPED_ATTRIBUTES = ("zoomAndPan", "version")
+
+COMPILED_DIR = "compiled"
+MANIFEST_NAME = "manifest.json"
+# base64 payloads of every compiled asset, read in one go at startup
+SNAPSHOT_NAME = "snapshot.json"
+
+
+class AssetReport(TypedDict):
+    """compiled asset size report"""
+    name: str
+    source_sha1: str
+    source_bytes: int
+    compiled_bytes: int
+    base64_bytes: int
+
+
+def _transform_scale(transform: str) -> float:
+    """get uniform scale factor applied by an svg transform attribute"""
+    scale = 1.0
+    for name, args in re.findall(r"(\w+)\s*\(([^)]*)\)", transform):
+        values = [float(v) for v in re.split(r"[\s,]+", args.strip()) if v]
+        if name == "matrix" and len(values) == 6:
+            a, b, c, d = values[:4]
+            scale *= math.sqrt(abs(a * d - b * c))
+        elif name == "scale" and values:
+            sx = values[0]
+            sy = values[1] if len(values) > 1 else sx
+            scale *= math.sqrt(abs(sx * sy))
+    return scale
+
+
+def _referenced_ids(root: ET.Element) -> set:
+    """collect ids referenced via url(#id) or href="#id" """
+    refs = set()
+    for element in root.iter():
+        for value in element.attrib.values():
+            refs.update(re.findall(r"url\(#([^)]+)\)", value))
+            if value.startswith("#"):
+                refs.add(value[1:])
+    return refs
+
+
+def _resample_png(data: bytes, target_px: int) -> bytes:
+    """downscale raster to target size and re-encode as optimized png"""
+    try:
+        from PIL import Image
+    except ImportError:
+        # pillow is optional, keep raster untouched without it
+        return data
+
+    image = Image.open(io.BytesIO(data))
+    if max(image.size) > target_px:
+        ratio = target_px / max(image.size)
+        size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+        image = image.resize(size, Image.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=True)
+    # never make an asset bigger than it was
+    return output.getvalue() if output.tell() < len(data) else data
+
+
+def compile_svg(source: bytes, display_px: int, density: float = 2.0) -> bytes:
+    """minify svg and re-encode embedded rasters at display resolution"""
+    root = ET.fromstring(source)
+
+    # drop unreferenced definitions, these files carry duplicate unused rasters
+    refs = _referenced_ids(root)
+    for defs in root.iter(f"{{{SVG_NS}}}defs"):
+        for child in list(defs):
+            if child.get("id") and child.get("id") not in refs:
+                defs.remove(child)
+
+    for attribute in DROPPED_ATTRIBUTES:
+        root.attrib.pop(attribute, None)
+
+    # user units to css pixels at the displayed size
+    view_box = [float(v) for v in re.split(r"[\s,]+", root.get("viewBox", "").strip()) if v]
+    width = view_box[2] if len(view_box) == 4 else float(root.get("width", display_px))
+    root_scale = display_px / width
+
+    parents = {child: parent for parent in root.iter() for child in parent}
+    for image in root.iter(f"{{{SVG_NS}}}image"):
+        href = image.get(HREF, "")
+        match = re.match(r"data:image/png;base64,(.*)", href, re.S)
+        if not match:
+            continue
+
+        # accumulate transforms up to the root
+        scale = root_scale
+        node: Optional[ET.Element] = image
+        while node is not None:
+            scale *= _transform_scale(node.get("transform", ""))
+            node = parents.get(node)
+
+        target_px = math.ceil(float(image.get("width", width)) * scale * density)
+        raster = _resample_png(base64.b64decode(match.group(1)), target_px)
+        image.set(HREF, "data:image/png;base64," + base64.b64encode(raster).decode("ascii"))
+
+    # strip indentation-only text between elements
+    for element in root.iter():
+        if element.text and not element.text.strip():
+            element.text = None
+        if element.tail and not element.tail.strip():
+            element.tail = None
+
+    return ET.tostring(root, encoding="utf-8", xml_declaration=False).replace(b" />", b"/>")
+
+
+def compile_assets(static_dir: Path = STATIC_PATH, names: Optional[Iterable[str]] = None,
+                   density: float = 2.0) -> List[AssetReport]:
+    """compile static svgs into the compiled directory and write manifest"""
+    output_dir = static_dir / COMPILED_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(static_dir)
+    snapshot = load_snapshot(static_dir)
+    reports: List[AssetReport] = []
+    for name in names or DISPLAY_SIZES:
+        source = (static_dir / name).read_bytes()
+        compiled = compile_svg(source, DISPLAY_SIZES[name], density)
+        encoded = base64.b64encode(compiled)
+
+        (output_dir / name).write_bytes(compiled)
+        snapshot[name] = encoded.decode("ascii")
+
+        report = AssetReport(
+            name=name,
+            source_sha1=hashlib.sha1(source).hexdigest(),
+            source_bytes=len(source),
+            compiled_bytes=len(compiled),
+            base64_bytes=len(encoded)
+        )
+        manifest[name] = report
+        reports.append(report)
+
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    (output_dir / SNAPSHOT_NAME).write_text(json.dumps(snapshot, separators=(",", ":")))
+    return reports
+
+
+def load_manifest(static_dir: Path = STATIC_PATH) -> Dict[str, AssetReport]:
+    """load compiled asset manifest, empty if assets were never compiled"""
+    try:
+        return json.loads((static_dir / COMPILED_DIR / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, IOError, ValueError):
+        return {}
+
+
+def stale_assets(static_dir: Path = STATIC_PATH) -> List[str]:
+    """list assets whose compiled output is missing or older than the source"""
+    manifest = load_manifest(static_dir)
+    stale = []
+    for name in DISPLAY_SIZES:
+        entry = manifest.get(name)
+        source_sha1 = hashlib.sha1((static_dir / name).read_bytes()).hexdigest()
+        if not entry or entry["source_sha1"] != source_sha1:
+            stale.append(name)
+    return stale
+
+
+def load_snapshot(static_dir: Path = STATIC_PATH) -> Dict[str, str]:
+    """load base64 payloads of compiled assets, empty if assets were never compiled"""
+    try:
+        return json.loads((static_dir / COMPILED_DIR / SNAPSHOT_NAME).read_text(encoding="ascii"))
+    except (FileNotFoundError, IOError, ValueError):
+        return {}
+
+
+def is_current(static_dir: Path, name: str) -> bool:
+    """whether an asset's compiled output was built from its current source"""
+    entry = load_manifest(static_dir).get(name)
+    if not entry:
+        return False
+    try:
+        # hashing the sources costs milliseconds, vinyl.svg alone is 2.3 MB
+        source_sha1 = hashlib.sha1((static_dir / name).read_bytes()).hexdigest()
+    except (FileNotFoundError, IOError):
+        return False
+    return entry.get("source_sha1") == source_sha1
+
+
+def load_compiled_base64(static_dir: Path, name: str, verify: bool = True) -> Optional[str]:
+    """get precomputed base64 payload, checked against the source unless verify is off"""
+    if verify and not is_current(static_dir, name):
+        return None
+    return load_snapshot(static_dir).get(name)
+
+
+def format_report(reports: List[AssetReport]) -> str:
+    """format size report as a plain text table"""
+    lines = [f"{'asset':<20}{'before':>12}{'after':>12}{'base64':>12}{'saved':>8}"]
+    for report in reports:
+        saved = 1 - report["compiled_bytes"] / report["source_bytes"]
+        lines.append(
+            f"{report['name']:<20}{report['source_bytes']:>12,}{report['compiled_bytes']:>12,}"
+            f"{report['base64_bytes']:>12,}{saved:>8.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """compile static assets from the command line"""
+    parser = argparse.ArgumentParser(description="compile static svg assets")
+    parser.add_argument("--density", type=float, default=2.0, help="pixel density to keep rasters at")
+    parser.add_argument("--only-stale", action="store_true", help="skip assets that are up to date")
+    args = parser.parse_args()
+
+    names = stale_assets() if args.only_stale else None
+    if names == []:
+        print("all assets up to date")
+        return
+    print(format_report(compile_assets(names=names, density=args.density)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,123 @@
+import asyncio
 import base64
+import math
 from pathlib import Path
 import httpx
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
 from functools import lru_cache
+from app.config import STATIC_PATH, Settings, get_settings
+from app.api.http import HttpClientPool, get_http_pool
+from app.utils.art_cache import AlbumArtStore, get_album_art_store
+from app.utils.cache import LRUCache
+from app.utils.assets import load_compiled_base64
+from app.utils.images import select_source, transcode
+from app.utils.timing import timed
+from app.domain.models import AlbumImage
+
+T = TypeVar("T")
+
+# recent cover downloads kept as fetched, so every theme size of one cover downloads it once
+SOURCE_CACHE_SIZE = 4
 
 
 class Base64Encoder:
     """handles image encoding with caching"""
     
-    def __init__(self, static_dir: Path):
-        """initialize with static directory path"""
+    def __init__(self, static_dir: Path, http: HttpClientPool, art_store: AlbumArtStore,
+                 settings: Settings):
+        """initialize with static directory path, shared http pool, album art store and settings"""
         self.static_dir = static_dir
-        self._cache: Dict[str, str] = {}
+        self.http = http
+        self.art_store = art_store
+        self.settings = settings
+        self.sources: LRUCache[bytes] = LRUCache(maxsize=SOURCE_CACHE_SIZE)
+        # downloads and resizes in progress, concurrent renders of one cover share the work
+        self._inflight: Dict[str, asyncio.Future] = {}
         
-    async def encode_url(self, url: str) -> str:
-        """encode remote image to base64 with caching"""
-        # return from cache if available
-        if url in self._cache:
-            return self._cache[url]
+    async def encode_album_art(self, images: List[AlbumImage], display_px: int) -> Optional[str]:
+        """encode album cover downscaled for a theme's display box, none when the download failed"""
+        target_px = math.ceil(display_px * self.settings.art_density)
+        url = select_source(images, target_px)
+        if not url:
+            return self.get_default_image()
             
-        # fetch and encode remote image
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=3.0)
-                if response.status_code == 200:
-                    encoded = base64.b64encode(response.content).decode('ascii')
-                    # cache for future requests
-                    self._cache[url] = encoded
-                    return encoded
-            except (httpx.RequestError, httpx.TimeoutException):
-                pass
-                
-        # fallback to default placeholder
-        return self.get_default_image()
+        # cache per source image, size and output format
+        key = f"{url}#{target_px}.{self.settings.art_format}"
+        cached = self.art_store.get(key)
+        if cached is not None:
+            return cached
+        return await self._shared(key, lambda: self._encode_art(url, key, target_px))
+        
+    async def _encode_art(self, url: str, key: str, target_px: int) -> Optional[str]:
+        """download, downscale and store one album cover size"""
+        with timed("image-fetch"):
+            data = await self._fetch(url)
+        if data is None:
+            # callers fall back to the placeholder without caching it as this cover
+            return None
+            
+        # resize off the event loop
+        with timed("image-resize"):
+            data = await asyncio.to_thread(
+                transcode, data, target_px, self.settings.art_format, self.settings.art_quality
+            )
+        encoded = base64.b64encode(data).decode('ascii')
+        self.art_store.set(key, encoded)
+        return encoded
+        
+    async def _fetch(self, url: str) -> Optional[bytes]:
+        """download remote image bytes, reusing a recent or in-progress download of the same url"""
+        data = self.sources.get(url)
+        if data is None:
+            data = await self._shared(url, lambda: self._download(url))
+            if data is not None:
+                self.sources.set(url, data)
+        return data
+    
+    async def _shared(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """run factory once for every concurrent caller with the same key"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # a cancelled caller must not cancel the work for the others
+        return await asyncio.shield(task)
+    
+    async def _download(self, url: str) -> Optional[bytes]:
+        """download remote image bytes, hedging slow or failed attempts"""
+        hedge_delay = self.settings.image_hedge_delay
+        if hedge_delay <= 0:
+            return await self._fetch_once(url)
+            
+        pending = {asyncio.create_task(self._fetch_once(url))}
+        launched = 1
+        try:
+            while pending:
+                # once every attempt is launched, just wait for the rest
+                timeout = hedge_delay if launched < self.settings.image_hedge_attempts else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+                        
+                # nothing usable yet, race another attempt
+                if launched < self.settings.image_hedge_attempts:
+                    pending.add(asyncio.create_task(self._fetch_once(url)))
+                    launched += 1
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fetch_once(self, url: str) -> Optional[bytes]:
+        """download remote image bytes in a single attempt"""
+        try:
+            response = await self.http.client.get(url, timeout=self.settings.image_timeout)
+            if response.status_code == 200:
+                return response.content
+        except (httpx.RequestError, httpx.TimeoutException):
+            pass
+        return None
     
     @lru_cache(maxsize=1)    
     def get_default_image(self) -> str:
@@ -50,6 +135,11 @@ class Base64Encoder:
     @lru_cache(maxsize=1)
     def get_spotify_logo(self) -> str:
         """get spotify logo from svg file"""
+        # serve precomputed payload from the asset compiler when up to date
+        compiled = load_compiled_base64(self.static_dir, "spotify.svg", not self.settings.cold_start)
+        if compiled:
+            return compiled
+            
         try:
             svg_path = self.static_dir / "spotify.svg"
             with open(svg_path, 'rb') as f:
@@ -67,6 +157,11 @@ class Base64Encoder:
     @lru_cache(maxsize=1)
     def get_vinyl_overlay(self) -> str:
         """get vinyl overlay from svg file"""
+        # serve precomputed payload from the asset compiler when up to date
+        compiled = load_compiled_base64(self.static_dir, "vinyl.svg", not self.settings.cold_start)
+        if compiled:
+            return compiled
+            
         try:
             svg_path = self.static_dir / "vinyl.svg"
             with open(svg_path, 'rb') as f:
@@ -90,6 +185,11 @@ class Base64Encoder:
     @lru_cache(maxsize=1)
     def get_vinyl_needle(self) -> str:
         """get vinyl needle overlay from svg file"""
+        # serve precomputed payload from the asset compiler when up to date
+        compiled = load_compiled_base64(self.static_dir, "vinyl-needle.svg", not self.settings.cold_start)
+        if compiled:
+            return compiled
+            
         try:
             svg_path = self.static_dir / "vinyl-needle.svg"
             with open(svg_path, 'rb') as f:
@@ -105,4 +205,10 @@ class Base64Encoder:
                 </g>
             </svg>
             '''
-            return base64.b64encode(svg.encode('utf-8')).decode('ascii')
\ No newline at end of file
+            return base64.b64encode(svg.encode('utf-8')).decode('ascii')
+
+
+@lru_cache
+def get_encoder() -> Base64Encoder:
+    """provide app-scoped base64 encoder"""
+    return Base64Encoder(STATIC_PATH, get_http_pool(), get_album_art_store(), get_settings())
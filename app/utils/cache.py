@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """bounded least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, maxsize: int, on_evict: Optional[Callable[[V], None]] = None):
+        """initialize with maximum number of entries and an optional callback for evicted values"""
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """get cached value and mark it as recently used"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """store value, evicting least recently used entries beyond maxsize"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            _, evicted = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def values(self) -> List[V]:
+        """snapshot of cached values without touching recency"""
+        return list(self._data.values())
+
+    def clear(self) -> None:
+        """drop all entries"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, int]:
+        """get cache size and hit/miss counters"""
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class LazyMapping(Mapping):
+    """read-only mapping built by a factory on first access"""
+
+    def __init__(self, factory: Callable[[], Dict[str, Any]]):
+        """initialize with the function producing the mapping"""
+        self._factory = factory
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._factory()
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import io
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.config import STATIC_PATH, get_settings
+from app.utils.cache import LRUCache
+
+# bundled font files, see the license files alongside them
+FONTS_DIR = STATIC_PATH / "fonts"
+
+# fonttools reports every dropped table at warning level
+logging.getLogger("fontTools").setLevel(logging.ERROR)
+
+
+@dataclass(frozen=True)
+class FontFace:
+    """one bundled font file exposed under a css family name"""
+    family: str
+    filename: str
+    weight: str = "normal"
+
+
+# bundled font sets by key, referenced from themes
+BUNDLED_FONTS: Dict[str, Tuple[FontFace, ...]] = {
+    # dotgothic16 is not bundled, a pixel face sampled from dejavu sans stands in (see app/utils/pixelfont.py)
+    "retro-pixel": (FontFace("Widget Pixel", "WidgetPixel-Regular.ttf"),),
+    # tahoma cannot be redistributed, dejavu sans shares its verdana-style design
+    "xp-sans": (
+        FontFace("Widget XP Sans", "DejaVuSans.ttf"),
+        FontFace("Widget XP Sans", "DejaVuSans-Bold.ttf", "bold"),
+    ),
+}
+
+
+def fonttools_available() -> bool:
+    """whether the optional fonttools package is installed"""
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def subset_font(data: bytes, text: str) -> Tuple[bytes, str]:
+    """subset font bytes to the glyphs in text, returning web font bytes and format"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    try:
+        import brotli  # noqa: F401
+        flavor = "woff2"
+    except ImportError:
+        flavor = "woff"
+
+    options = subset.Options()
+    options.flavor = flavor
+    options.hinting = False
+    options.desubroutinize = True
+    options.layout_features = ["kern", "liga"]
+    options.name_IDs = [1, 2]
+    options.notdef_outline = True
+    options.ignore_missing_glyphs = True
+    options.drop_tables += ["FFTM"]
+
+    font = TTFont(io.BytesIO(data), lazy=True)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+
+    output = io.BytesIO()
+    font.flavor = flavor
+    font.save(output)
+    return output.getvalue(), flavor
+
+
+class FontSubsetter:
+    """builds base64 @font-face rules holding only the glyphs a widget shows"""
+
+    def __init__(self, fonts_dir: Path, cache_size: int):
+        """initialize with font directory and number of glyph sets to keep"""
+        self.fonts_dir = fonts_dir
+        self.cache: LRUCache[str] = LRUCache(maxsize=cache_size)
+        self._sources: Dict[str, bytes] = {}
+
+    def available(self, font: str) -> bool:
+        """whether every file of a bundled font set is present and can be subset"""
+        faces = BUNDLED_FONTS.get(font)
+        return bool(faces) and fonttools_available() and all(
+            (self.fonts_dir / face.filename).is_file() for face in faces
+        )
+
+    async def font_face_css(self, font: str, text: str) -> Optional[str]:
+        """get @font-face rules for a font set covering text, or none when unavailable"""
+        # one entry per distinct glyph set, so track changes only miss on new characters
+        glyphs = "".join(sorted(set(text)))
+        key = (font, glyphs)
+        css = self.cache.get(key)
+        if css is not None:
+            return css
+        if not self.available(font):
+            return None
+
+        # subsetting takes ~100ms per face, keep it off the event loop
+        css = await asyncio.to_thread(self._build_css, font, glyphs)
+        self.cache.set(key, css)
+        return css
+
+    def _build_css(self, font: str, glyphs: str) -> str:
+        """subset every face of a font set into data-url @font-face rules"""
+        rules: List[str] = []
+        for face in BUNDLED_FONTS[font]:
+            data, flavor = subset_font(self._source(face.filename), glyphs)
+            encoded = base64.b64encode(data).decode("ascii")
+            rules.append(
+                f"@font-face{{font-family:'{face.family}';font-weight:{face.weight};"
+                f"src:url(data:font/{flavor};base64,{encoded}) format('{flavor}');}}"
+            )
+        return "".join(rules)
+
+    def _source(self, filename: str) -> bytes:
+        """read bundled font file once"""
+        data = self._sources.get(filename)
+        if data is None:
+            data = (self.fonts_dir / filename).read_bytes()
+            self._sources[filename] = data
+        return data
+
+
+@lru_cache
+def get_font_subsetter() -> FontSubsetter:
+    """provide app-scoped font subsetter"""
+    return FontSubsetter(FONTS_DIR, get_settings().font_cache_size)
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import io
+from typing import List, Optional
+from app.domain.models import AlbumImage
+
+# css box (px) album art is displayed at unless a theme says otherwise
+DEFAULT_ART_SIZE = 120
+
+# leading bytes identifying common image formats
+MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG", "image/png"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def sniff_mime(encoded: str) -> str:
+    """detect mime type of a base64 image payload from its leading bytes"""
+    try:
+        head = base64.b64decode(encoded[:32])
+    except (binascii.Error, ValueError):
+        return "image/png"
+
+    for magic, mime in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return mime
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    if b"<svg" in head or head.lstrip().startswith(b"<"):
+        return "image/svg+xml"
+    return "image/png"
+
+
+def select_source(images: List[AlbumImage], target_px: int) -> Optional[str]:
+    """pick smallest source meeting target size, or the largest available"""
+    if not images:
+        return None
+
+    # unknown dimensions sort as largest so they are only used as last resort
+    def edge(image: AlbumImage) -> int:
+        return min(image.get("width") or 10_000, image.get("height") or 10_000)
+
+    by_size = sorted(images, key=edge)
+    for image in by_size:
+        if edge(image) >= target_px:
+            return image["url"]
+    return by_size[-1]["url"]
+
+
+def transcode(data: bytes, target_px: int, fmt: str = "jpeg", quality: int = 80) -> bytes:
+    """downscale image to target size and re-encode in a compact format"""
+    try:
+        from PIL import Image
+    except ImportError:
+        # pillow is optional, serve source bytes without it
+        return data
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, ValueError):
+        return data
+
+    if max(image.size) > target_px:
+        image.thumbnail((target_px, target_px), Image.LANCZOS)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    if fmt == "webp":
+        image.save(output, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+
+    # keep the source when re-encoding does not pay off
+    return output.getvalue() if output.tell() < len(data) else data
@@ -0,0 +1,146 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# (labels, value) pairs reported by a scrape-time collector
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    """escape a label value for the prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """format a label set, optionally with a trailing preformatted label"""
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    """format a sample value"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # plain dict updates, safe without locks on the single event loop thread
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """add to the series for these label values"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_number(count)}")
+        return lines
+
+
+class Histogram:
+    """fixed-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # per series: one count per bucket plus +inf, then sum and count
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """record one observation"""
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0] * (len(self.buckets) + 3))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labels, values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {_number(series[-1])}")
+        return lines
+
+
+class CollectedMetric:
+    """metric family read from existing state at scrape time"""
+
+    def __init__(self, name: str, help: str, kind: str, collect: Callable[[], Samples]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.collect = collect
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """process-wide set of metric families"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """create and register a counter"""
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """create and register a histogram"""
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def collector(self, name: str, help: str, kind: str, collect: Callable[[], Samples]) -> CollectedMetric:
+        """register a family whose samples are gathered at scrape time"""
+        return self._register(CollectedMetric(name, help, kind, collect))
+
+    def _register(self, metric):
+        # re-registering replaces, so reloads do not duplicate families
+        self._metrics[metric.name] = metric
+        return metric
+
+    def exposition(self) -> str:
+        """render every family in prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "widget_requests_total", "Widget requests by endpoint, theme and status", ("endpoint", "theme", "status")
+)
+RENDER_SECONDS = registry.histogram(
+    "widget_render_seconds", "Time to build and render an uncached widget", ("template",)
+)
+RESPONSE_BYTES = registry.histogram(
+    "widget_response_bytes", "Widget response body size", ("template", "encoding"), BYTES_BUCKETS
+)
+SPOTIFY_SECONDS = registry.histogram(
+    "spotify_request_seconds", "Spotify call latency by route and status", ("route", "status")
+)
@@ -0,0 +1,51 @@
+import io
+from typing import List, Tuple
+
+RGB = Tuple[int, int, int]
+
+# edge length (px) images are reduced to before clustering
+SAMPLE_SIZE = 32
+
+# rec. 601 luma weights used to seed clusters deterministically
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+
+def extract_palette(data: bytes, colors: int = 4, iterations: int = 8) -> List[RGB]:
+    """extract dominant colors from image bytes, most common first"""
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        # numpy and pillow are optional, callers fall back to default colors
+        return []
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        # let jpeg decode at reduced scale instead of full resolution
+        image.draft("RGB", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+        image = image.convert("RGB")
+    except (OSError, ValueError):
+        return []
+    image.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+
+    pixels = np.asarray(image, dtype=np.float32).reshape(-1, 3)
+    colors = min(colors, len(pixels))
+
+    # seed centers evenly across luminance so results are reproducible
+    order = np.argsort(pixels @ np.array(LUMA_WEIGHTS, dtype=np.float32))
+    centers = pixels[order[np.linspace(0, len(order) - 1, colors).astype(int)]].copy()
+
+    counts = np.zeros(colors, dtype=np.int64)
+    for _ in range(iterations):
+        distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=colors)
+        sums = np.stack(
+            [np.bincount(labels, weights=pixels[:, channel], minlength=colors) for channel in range(3)],
+            axis=1
+        )
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+
+    ranked = np.argsort(-counts, kind="stable")
+    return [tuple(int(round(value)) for value in centers[i]) for i in ranked if counts[i] > 0]
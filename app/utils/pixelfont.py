@@ -0,0 +1,211 @@
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.utils.fonts import FONTS_DIR
+
+# the retro pixel face is dejavu sans sampled onto a coarse grid, so it can be bundled
+# under dejavu's license like the xp stand-in, with a family name free of the reserved ones
+SOURCE_NAME = "DejaVuSans.ttf"
+OUTPUT_NAME = "WidgetPixel-Regular.ttf"
+FAMILY = "Widget Pixel"
+
+# grid cells per em, retro draws at 12-16px so each cell lands on about one device pixel
+PIXELS_PER_EM = 16
+# font units per cell in the generated file
+CELL = 64
+
+# characters kept: printable latin, latin-1, latin extended-a, punctuation and the symbols themes draw
+RANGES = ((0x20, 0x7E), (0xA0, 0x17F), (0x2010, 0x2027), (0x2030, 0x203A), (0x25CF, 0x25CF))
+
+# line segments per curve when flattening outlines
+CURVE_STEPS = 8
+
+# head table timestamp (seconds since 1904, here 2024-01-01), fixed so rebuilds are byte-identical
+TIMESTAMP = 3786912000
+
+Point = Tuple[float, float]
+
+
+class _FlattenPen:
+    """records glyph outlines as closed polygons, flattening curves"""
+
+    def __init__(self, glyph_set):
+        from fontTools.pens.basePen import BasePen
+
+        polygons: List[List[Point]] = []
+
+        class Pen(BasePen):
+            def _moveTo(self, pt):
+                polygons.append([pt])
+
+            def _lineTo(self, pt):
+                polygons[-1].append(pt)
+
+            def _curveToOne(self, pt1, pt2, pt3):
+                x0, y0 = polygons[-1][-1]
+                for step in range(1, CURVE_STEPS + 1):
+                    t = step / CURVE_STEPS
+                    u = 1 - t
+                    polygons[-1].append((
+                        u ** 3 * x0 + 3 * u * u * t * pt1[0] + 3 * u * t * t * pt2[0] + t ** 3 * pt3[0],
+                        u ** 3 * y0 + 3 * u * u * t * pt1[1] + 3 * u * t * t * pt2[1] + t ** 3 * pt3[1],
+                    ))
+
+            def _qCurveToOne(self, pt1, pt2):
+                x0, y0 = polygons[-1][-1]
+                for step in range(1, CURVE_STEPS + 1):
+                    t = step / CURVE_STEPS
+                    u = 1 - t
+                    polygons[-1].append((
+                        u * u * x0 + 2 * u * t * pt1[0] + t * t * pt2[0],
+                        u * u * y0 + 2 * u * t * pt1[1] + t * t * pt2[1],
+                    ))
+
+        self.pen = Pen(glyph_set)
+        self.polygons = polygons
+
+
+def _winding(polygons: List[List[Point]], x: float, y: float) -> int:
+    """nonzero winding number of a point against closed polygons"""
+    winding = 0
+    for polygon in polygons:
+        for (x0, y0), (x1, y1) in zip(polygon, polygon[1:] + polygon[:1]):
+            if y0 <= y < y1 and (x1 - x0) * (y - y0) - (x - x0) * (y1 - y0) > 0:
+                winding += 1
+            elif y1 <= y < y0 and (x1 - x0) * (y - y0) - (x - x0) * (y1 - y0) < 0:
+                winding -= 1
+    return winding
+
+
+def rasterize(polygons: List[List[Point]], unit: float) -> Set[Tuple[int, int]]:
+    """grid cells whose centers fall inside the outline, with cells unit font units wide"""
+    points = [point for polygon in polygons for point in polygon]
+    if not points:
+        return set()
+    x_min = int(min(x for x, _ in points) // unit)
+    x_max = int(max(x for x, _ in points) // unit) + 1
+    y_min = int(min(y for _, y in points) // unit)
+    y_max = int(max(y for _, y in points) // unit) + 1
+    return {
+        (col, row)
+        for row in range(y_min, y_max)
+        for col in range(x_min, x_max)
+        if _winding(polygons, (col + 0.5) * unit, (row + 0.5) * unit)
+    }
+
+
+def cell_rectangles(cells: Set[Tuple[int, int]]) -> List[Tuple[int, int, int, int]]:
+    """merge cells into rectangles (col, row, width, height), runs per row joined across equal rows"""
+    runs: Dict[Tuple[int, int], List[int]] = {}
+    for row in sorted({row for _, row in cells}):
+        cols = sorted(col for col, r in cells if r == row)
+        start = cols[0]
+        for col, following in zip(cols, cols[1:] + [None]):
+            if following != col + 1:
+                runs.setdefault((start, col - start + 1), []).append(row)
+                start = following
+
+    rectangles = []
+    for (col, width), rows in runs.items():
+        top = rows[0]
+        for row, following in zip(rows, rows[1:] + [None]):
+            if following != row + 1:
+                rectangles.append((col, top, width, row - top + 1))
+                top = following
+    return sorted(rectangles, key=lambda rect: (rect[1], rect[0]))
+
+
+def codepoints(ranges: Iterable[Tuple[int, int]] = RANGES) -> List[int]:
+    """codepoints covered by the pixel font"""
+    return [codepoint for start, end in ranges for codepoint in range(start, end + 1)]
+
+
+def build_pixel_font(source: Path, output: Path) -> Dict[str, int]:
+    """sample a font onto the pixel grid and write it as a truetype font"""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(str(source))
+    unit = font["head"].unitsPerEm / PIXELS_PER_EM
+    source_cmap = font.getBestCmap()
+    glyph_set = font.getGlyphSet()
+    metrics = font["hmtx"].metrics
+
+    cmap: Dict[int, str] = {}
+    glyphs = {}
+    advances = {}
+    notdef = TTGlyphPen(None)
+    # hollow box, drawn counter-clockwise inside the outer square
+    for x0, y0, x1, y1, clockwise in ((1, 0, 7, 11, True), (2, 1, 6, 10, False)):
+        corners = [(x0, y0), (x0, y1), (x1, y1), (x1, y0)]
+        for i, (x, y) in enumerate(corners if clockwise else corners[::-1]):
+            (notdef.moveTo if i == 0 else notdef.lineTo)((x * CELL, y * CELL))
+        notdef.closePath()
+    glyphs[".notdef"] = notdef.glyph()
+    advances[".notdef"] = 8 * CELL
+
+    for codepoint in codepoints():
+        name = source_cmap.get(codepoint)
+        if name is None:
+            continue
+        flatten = _FlattenPen(glyph_set)
+        glyph_set[name].draw(flatten.pen)
+        pen = TTGlyphPen(None)
+        for col, row, width, height in cell_rectangles(rasterize(flatten.polygons, unit)):
+            x0, y0, x1, y1 = col * CELL, row * CELL, (col + width) * CELL, (row + height) * CELL
+            # clockwise, truetype's outer contour direction
+            pen.moveTo((x0, y0))
+            pen.lineTo((x0, y1))
+            pen.lineTo((x1, y1))
+            pen.lineTo((x1, y0))
+            pen.closePath()
+        glyph_name = f"uni{codepoint:04X}"
+        glyphs[glyph_name] = pen.glyph()
+        advances[glyph_name] = round(metrics[name][0] / unit) * CELL
+        cmap[codepoint] = glyph_name
+
+    hhea = font["hhea"]
+    ascent = round(hhea.ascent / unit) * CELL
+    descent = round(hhea.descent / unit) * CELL
+
+    builder = FontBuilder(PIXELS_PER_EM * CELL, isTTF=True)
+    order = list(glyphs)
+    builder.setupGlyphOrder(order)
+    builder.setupCharacterMap(cmap)
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({
+        name: (advances[name], glyphs[name].xMin if glyphs[name].numberOfContours else 0) for name in order
+    })
+    builder.setupHorizontalHeader(ascent=ascent, descent=descent)
+    builder.setupNameTable({
+        "familyName": FAMILY,
+        "styleName": "Regular",
+        "uniqueFontIdentifier": f"{FAMILY.replace(' ', '')}-Regular",
+        "fullName": f"{FAMILY} Regular",
+        "psName": f"{FAMILY.replace(' ', '')}-Regular",
+        "version": "Version 1.000",
+        "copyright": "Derived from DejaVu Sans by sampling onto a 16 per em grid, see LICENSE_DEJAVU",
+    })
+    builder.setupOS2(sTypoAscender=ascent, sTypoDescender=descent, usWinAscent=ascent, usWinDescent=-descent)
+    builder.setupPost()
+    builder.font["head"].created = TIMESTAMP
+    builder.font["head"].modified = TIMESTAMP
+    builder.font.recalcTimestamp = False
+    builder.save(str(output))
+    return {"glyphs": len(cmap), "bytes": output.stat().st_size}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """rebuild the bundled pixel font from the command line"""
+    parser = argparse.ArgumentParser(description="sample dejavu sans into the bundled pixel font")
+    parser.add_argument("--source", type=Path, default=FONTS_DIR / SOURCE_NAME)
+    parser.add_argument("--output", type=Path, default=FONTS_DIR / OUTPUT_NAME)
+    args = parser.parse_args(argv)
+
+    report = build_pixel_font(args.source, args.output)
+    print(f"wrote {args.output} ({report['glyphs']} glyphs, {report['bytes']:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.config import STATIC_PATH
+from app.utils.assets import COMPILED_DIR, is_current
+
+# url prefix the static directory is mounted at
+STATIC_URL = "/static"
+
+# hashed urls change whenever the content does, so clients may keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# name.<digest>.ext
+HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{8})(?P<suffix>\.\w+)$")
+
+
+@lru_cache(maxsize=32)
+def file_digest(path: Path) -> str:
+    """short content hash of a static file"""
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:8]
+
+
+def asset_path(name: str, static_dir: Path = STATIC_PATH) -> str:
+    """path of an asset relative to the static directory, preferring its compiled version while current"""
+    compiled = f"{COMPILED_DIR}/{name}"
+    # output left over from an older source, e.g. when a read-only deploy could not recompile,
+    # would otherwise be served under a lasting url
+    if (static_dir / compiled).is_file() and is_current(static_dir, name):
+        return compiled
+    return name
+
+
+@lru_cache(maxsize=32)
+def asset_url(name: str, static_dir: Path = STATIC_PATH) -> str:
+    """content-hashed url of a static asset"""
+    path = asset_path(name, static_dir)
+    stem, dot, suffix = path.rpartition(".")
+    return f"{STATIC_URL}/{stem}.{file_digest(static_dir / path)}{dot}{suffix}"
+
+
+class HashedStaticFiles(StaticFiles):
+    """static files that also answer content-hashed names with immutable caching"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """serve name.<digest>.ext as name.ext, long-lived when the digest is current"""
+        match = HASHED_NAME.match(path)
+        if match is None or self.directory is None:
+            return await super().get_response(path, scope)
+
+        plain = f"{match['stem']}{match['suffix']}"
+        response = await super().get_response(plain, scope)
+        # an old digest still gets the current file, just not cached for good
+        if file_digest(Path(self.directory) / plain) == match["digest"]:
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
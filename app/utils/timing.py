@@ -0,0 +1,77 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+access_logger = logging.getLogger("app.access")
+
+# stage durations (ms) of the request being served, none outside requests
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """time a pipeline stage into the current request, summing repeated stages"""
+    timings = _current.get()
+    if timings is None:
+        # background work such as the poller has nothing to report to
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def server_timing(timings: Dict[str, float], total_ms: float) -> str:
+    """format stage timings as a server-timing header value"""
+    metrics = [f"{stage};dur={duration:.1f}" for stage, duration in timings.items()]
+    metrics.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(metrics)
+
+
+class TimingMiddleware:
+    """asgi middleware collecting per-stage timings for each http request"""
+
+    def __init__(self, app, header: bool = True):
+        """wrap asgi app, optionally exposing timings in a server-timing header"""
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # tasks spawned while serving inherit this dict through the context
+        timings: Dict[str, float] = {}
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    total_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(timings, total_ms).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info("request", extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    "stages": {stage: round(duration, 2) for stage, duration in timings.items()},
+                })
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from bench.fake_spotify import FakeSpotifyConfig, create_fake_spotify
+
+# default budgets, shared by the command line and the test suite
+IMPORT_BUDGET_MS = 1000.0
+FIRST_REQUEST_BUDGET_MS = 500.0
+
+
+def parse_importtime(stderr: str, top: int = 10) -> Tuple[float, List[Tuple[str, float]]]:
+    """total app import time and slowest modules by self time, in ms, from -X importtime output"""
+    total = 0.0
+    modules: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((name, int(self_us) / 1000))
+        if name == "app.main":
+            total = int(cumulative_us) / 1000
+    modules.sort(key=lambda module: module[1], reverse=True)
+    return total, modules[:top]
+
+
+def measure_import(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float]]]:
+    """import the app in a fresh interpreter under -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_first_request(env: Dict[str, str], path: str, theme: str) -> Dict:
+    """time import, startup and the first request in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-m", "bench.coldstart", "--child", "--path", path, "--theme", theme],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def cold_env(cold_start: bool = True) -> Dict[str, str]:
+    """environment for fresh app processes, serverless mode unless disabled"""
+    env = dict(os.environ)
+    env.setdefault("REFRESH_TOKEN", "bench-refresh-token")
+    env["POLL_INTERVAL"] = "0"
+    if cold_start:
+        env["COLD_START"] = "true"
+    return env
+
+
+async def child(path: str, theme: str) -> Dict:
+    """serve one request from a cold process against the fake spotify"""
+    start = time.perf_counter()
+    from app.api.http import get_http_pool
+    from app.main import app
+    imported = time.perf_counter()
+
+    get_http_pool().transport = httpx.ASGITransport(app=create_fake_spotify(FakeSpotifyConfig(latency=0)))
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://cold") as client:
+            response = await client.get(path, params={"theme": theme})
+        done = time.perf_counter()
+
+    return {
+        "import_ms": round((imported - start) * 1000, 1),
+        "startup_ms": round((started - imported) * 1000, 1),
+        "first_request_ms": round((done - started) * 1000, 1),
+        "status": response.status_code,
+        "server_timing": response.headers.get("server-timing", ""),
+    }
+
+
+def main() -> None:
+    """check cold-start import time and first-request latency against budgets"""
+    parser = argparse.ArgumentParser(description="measure serverless cold starts against time budgets")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS, help="max app import time")
+    parser.add_argument("--first-request-budget-ms", type=float, default=FIRST_REQUEST_BUDGET_MS,
+                        help="max startup plus first request time")
+    parser.add_argument("--path", default="/github", help="endpoint of the first request")
+    parser.add_argument("--theme", default="default", help="theme of the first request")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per measurement, the median counts")
+    parser.add_argument("--no-cold-start", action="store_true", help="measure with COLD_START unset")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(child(args.path, args.theme))))
+        return
+
+    env = cold_env(cold_start=not args.no_cold_start)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in imports)
+    requests = [measure_first_request(env, args.path, args.theme) for _ in range(args.runs)]
+    first_ms = statistics.median(run["startup_ms"] + run["first_request_ms"] for run in requests)
+
+    print(f"{'app import':<24}{import_ms:>10.1f} ms  (budget {args.import_budget_ms:g})")
+    for name, self_ms in imports[0][1]:
+        print(f"  {name:<40}{self_ms:>8.1f} ms")
+    print(f"{'startup + first request':<24}{first_ms:>10.1f} ms  (budget {args.first_request_budget_ms:g})")
+    print(f"  {requests[0]['server_timing']}")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.1f} ms, budget {args.import_budget_ms:g} ms")
+    if first_ms > args.first_request_budget_ms:
+        failures.append(f"first request took {first_ms:.1f} ms, budget {args.first_request_budget_ms:g} ms")
+    if any(run["status"] != 200 for run in requests):
+        failures.append(f"first request returned {requests[0]['status']}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
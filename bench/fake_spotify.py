@@ -0,0 +1,130 @@
+import asyncio
+import io
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeSpotifyConfig:
+    """behavior of the local spotify stand-in"""
+    # seconds added to every response
+    latency: float = 0.02
+    # currently-playing behavior: playing, idle (204), ratelimit (429) or error (503)
+    mode: str = "playing"
+    # fraction of api calls that fail with 503 regardless of mode
+    error_rate: float = 0.0
+    # seconds advertised in retry-after on 429
+    retry_after: int = 1
+    # switch to a new track every n currently-playing calls (0 keeps one track)
+    rotate_every: int = 0
+    # access token lifetime in seconds
+    expires_in: int = 3600
+    seed: int = 0
+    calls: Counter = field(default_factory=Counter)
+
+
+@lru_cache(maxsize=8)
+def cover_image(track: int, size: int) -> bytes:
+    """generate a deterministic jpeg cover for a fake track"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(track)
+    image = Image.new("RGB", (size, size), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = rng.randrange(size), rng.randrange(size)
+        x1, y1 = x0 + rng.randrange(size // 2), y0 + rng.randrange(size // 2)
+        draw.ellipse((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def track_item(track: int) -> Dict:
+    """build a currently-playing style track object"""
+    return {
+        "id": f"fake{track:06d}",
+        "uri": f"spotify:track:fake{track:06d}",
+        "name": f"Benchmark Track {track} & Friends",
+        "artists": [{"name": f"Artist {track % 7}"}],
+        "album": {
+            "images": [
+                {"url": f"https://i.scdn.co/image/{track}-{size}", "width": size, "height": size}
+                for size in (640, 300, 64)
+            ]
+        },
+    }
+
+
+def create_fake_spotify(config: Optional[FakeSpotifyConfig] = None) -> FastAPI:
+    """create asgi app standing in for accounts, api and image cdn hosts"""
+    config = config or FakeSpotifyConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI()
+    app.state.config = config
+
+    async def delay(route: str) -> Optional[Response]:
+        """count call, apply latency and injected failures"""
+        config.calls[route] += 1
+        if config.latency:
+            await asyncio.sleep(config.latency)
+        if config.error_rate and rng.random() < config.error_rate:
+            return Response(status_code=503)
+        return None
+
+    def current_track() -> int:
+        """track number currently playing"""
+        if not config.rotate_every:
+            return 0
+        return config.calls["currently-playing"] // config.rotate_every
+
+    @app.post("/api/token")
+    async def token(request: Request):
+        await delay("token")
+        return JSONResponse({
+            "access_token": f"fake-token-{config.calls['token']}",
+            "token_type": "Bearer",
+            "expires_in": config.expires_in,
+        })
+
+    @app.get("/v1/me/player/currently-playing")
+    async def currently_playing(request: Request):
+        failure = await delay("currently-playing")
+        if failure is not None:
+            return failure
+        if config.mode == "idle":
+            return Response(status_code=204)
+        if config.mode == "ratelimit":
+            return Response(status_code=429, headers={"Retry-After": str(config.retry_after)})
+        if config.mode == "error":
+            return Response(status_code=503)
+        return JSONResponse({"is_playing": True, "item": track_item(current_track())})
+
+    @app.get("/v1/me/player/recently-played")
+    async def recently_played(request: Request):
+        failure = await delay("recently-played")
+        if failure is not None:
+            return failure
+        if config.mode == "ratelimit":
+            return Response(status_code=429, headers={"Retry-After": str(config.retry_after)})
+        if config.mode == "error":
+            return Response(status_code=503)
+        items = [
+            {"played_at": f"2024-01-01T00:00:{i:02d}Z", "track": track_item(current_track() + i)}
+            for i in range(3)
+        ]
+        return JSONResponse({"items": items})
+
+    @app.get("/image/{image_id}")
+    async def image(image_id: str):
+        await delay("image")
+        track, _, size = image_id.partition("-")
+        return Response(cover_image(int(track), int(size or 300)), media_type="image/jpeg")
+
+    return app
@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench.fake_spotify import FakeSpotifyConfig, create_fake_spotify
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """nearest-rank percentile of a sample list"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def git_revision() -> Optional[str]:
+    """short commit hash of the tree being measured"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_scenario(client: httpx.AsyncClient, fake: FakeSpotifyConfig, path: str,
+                       params: Dict[str, str], requests: int, concurrency: int) -> Dict:
+    """drive one endpoint and collect latency, size and upstream call stats"""
+    # one warm-up request so scenarios measure steady state
+    await client.get(path, params=params)
+
+    calls_before = dict(fake.calls)
+    latencies: List[float] = []
+    sizes: List[int] = []
+    statuses: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(response.content))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    outbound = {route: count - calls_before.get(route, 0) for route, count in fake.calls.items()}
+    return {
+        "path": path,
+        "params": params,
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "response_bytes": {
+            "mean": round(sum(sizes) / len(sizes)),
+            "max": max(sizes),
+        },
+        "status": statuses,
+        "outbound_calls": {route: count for route, count in outbound.items() if count},
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """run all scenarios against the app wired to the fake spotify"""
+    # settings are read on first use, so configure before importing the app
+    os.environ.setdefault("REFRESH_TOKEN", "bench-refresh-token")
+    os.environ["POLL_INTERVAL"] = str(args.poll_interval)
+    # the app's default limit would answer most bench requests with throttled fallbacks
+    os.environ["SPOTIFY_RATE_LIMIT"] = str(args.rate_limit)
+
+    from app.api.http import get_http_pool
+    from app.domain.models import ThemeType
+    from app.main import app
+
+    fake_config = FakeSpotifyConfig(
+        latency=args.latency,
+        mode=args.mode,
+        error_rate=args.error_rate,
+        rotate_every=args.rotate_every,
+    )
+    get_http_pool().transport = httpx.ASGITransport(app=create_fake_spotify(fake_config))
+
+    themes = args.themes or [theme.value for theme in ThemeType]
+    rate_limit = f"{args.rate_limit:g}/s" if args.rate_limit > 0 else "off"
+    print(f"spotify rate limit: {rate_limit}", file=sys.stderr)
+    scenarios = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in args.endpoints:
+                variants = [{}] if path == "/link" else [{"theme": theme} for theme in themes]
+                for params in variants:
+                    result = await run_scenario(
+                        client, fake_config, path, params, args.requests, args.concurrency
+                    )
+                    scenarios.append(result)
+                    label = f"{path} {params.get('theme', '')}".strip()
+                    print(
+                        f"{label:<28}{result['rps']:>9.1f} rps"
+                        f"{result['latency_ms']['p50']:>9.2f}{result['latency_ms']['p95']:>9.2f}"
+                        f"{result['latency_ms']['p99']:>9.2f} ms"
+                        f"{result['response_bytes']['mean']:>11,} B"
+                        f"  {result['outbound_calls']}",
+                        file=sys.stderr
+                    )
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "poll_interval": args.poll_interval,
+            "rate_limit": args.rate_limit,
+            "upstream": {
+                "latency_s": args.latency,
+                "mode": args.mode,
+                "error_rate": args.error_rate,
+                "rotate_every": args.rotate_every,
+            },
+        },
+        "scenarios": scenarios,
+        "upstream_calls_total": dict(fake_config.calls),
+    }
+
+
+def main() -> None:
+    """run the benchmark suite from the command line"""
+    parser = argparse.ArgumentParser(description="offline widget benchmark against a fake spotify")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent in-flight requests")
+    parser.add_argument("--endpoints", nargs="+", default=["/", "/github", "/link"])
+    parser.add_argument("--themes", nargs="*", help="themes to render (default: all)")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake upstream latency in seconds")
+    parser.add_argument("--mode", choices=["playing", "idle", "ratelimit", "error"], default="playing")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream 503s")
+    parser.add_argument("--rotate-every", type=int, default=0, help="change track every n upstream polls")
+    parser.add_argument("--poll-interval", type=float, default=0.0, help="background poll interval")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="app-side spotify calls per second (default: 0, unthrottled)")
+    parser.add_argument("--output", default="bench_results.json", help="json results file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
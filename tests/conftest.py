@@ -0,0 +1,93 @@
+import os
+from collections import Counter
+from typing import Iterator
+
+# settings are read from the environment, pin them before the app is imported
+os.environ.setdefault("REFRESH_TOKEN", "test-refresh-token")
+os.environ["POLL_INTERVAL"] = "0"
+os.environ["TOKEN_CACHE_PATH"] = ""
+os.environ["ART_CACHE_DIR"] = ""
+os.environ["MULTI_USER"] = "false"
+os.environ["LOG_LEVEL"] = "WARNING"
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from bench.fake_spotify import cover_image, track_item
+
+from app.api.http import get_http_pool
+from app.api.limits import get_upstream_guard
+from app.api.poller import get_poller
+from app.api.spotify import get_auth_client, get_spotify_client
+from app.api.tenants import get_tenants, get_user_store
+from app.config import get_settings
+from app.render.engine import get_renderer
+from app.utils.art_cache import get_album_art_store
+from app.utils.base64 import get_encoder
+from app.utils.fonts import get_font_subsetter
+
+# app-scoped providers whose instances carry caches, tokens or counters between requests
+PROVIDERS = (
+    get_settings, get_http_pool, get_upstream_guard, get_poller, get_auth_client, get_spotify_client,
+    get_user_store, get_tenants, get_album_art_store, get_encoder, get_font_subsetter, get_renderer,
+)
+
+
+class Upstream:
+    """scripted stand-in for the spotify accounts, api and image hosts"""
+
+    def __init__(self, track: int = 1):
+        """initialize playing one fake track"""
+        self.track = track
+        # cover downloads answered with 503 before covers are served again
+        self.image_failures = 0
+        # api calls answered with 401 before tokens are accepted again
+        self.rejections = 0
+        self.calls: Counter = Counter()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """answer one outbound request"""
+        path = request.url.path
+        if path.endswith("/api/token"):
+            self.calls["token"] += 1
+            return httpx.Response(200, json={"access_token": "test-token", "expires_in": 3600})
+        if path.endswith("/currently-playing"):
+            self.calls["currently-playing"] += 1
+            if self.rejections > 0:
+                self.rejections -= 1
+                return httpx.Response(401)
+            return httpx.Response(200, json={"is_playing": True, "item": track_item(self.track)})
+        if path.startswith("/image/"):
+            self.calls["image"] += 1
+            if self.image_failures > 0:
+                self.image_failures -= 1
+                return httpx.Response(503)
+            size = int(path.rsplit("-", 1)[1])
+            return httpx.Response(200, content=cover_image(self.track, size), headers={"content-type": "image/jpeg"})
+        return httpx.Response(404)
+
+
+def reset_providers() -> None:
+    """drop every app-scoped instance so each test starts cold"""
+    for provider in PROVIDERS:
+        provider.cache_clear()
+
+
+@pytest.fixture
+def upstream() -> Upstream:
+    """fake spotify wired into the shared http pool"""
+    reset_providers()
+    fake = Upstream()
+    get_http_pool().transport = httpx.MockTransport(fake.handle)
+    return fake
+
+
+@pytest.fixture
+def client(upstream: Upstream) -> Iterator[TestClient]:
+    """test client for the app against the fake spotify"""
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+    reset_providers()
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+from app.utils.art_cache import AlbumArtStore
+
+
+def age(store: AlbumArtStore, key: str, mtime: float) -> None:
+    """backdate one disk entry"""
+    os.utime(store._disk_path(key), (mtime, mtime))
+
+
+def test_disk_tier_evicts_oldest_files_over_budget(tmp_path: Path):
+    """writes beyond the disk budget delete the least recently used covers first"""
+    store = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=300)
+    for i, key in enumerate(("a", "b", "c")):
+        store.set(key, str(i) * 100)
+        age(store, key, 1_000 + i)
+    assert store.disk_bytes == 300
+
+    store.set("d", "d" * 100)
+    assert store.disk_bytes <= 300
+    assert not store._disk_path("a").exists()
+    assert all(store._disk_path(key).exists() for key in ("b", "c", "d"))
+
+
+def test_disk_read_refreshes_recency(tmp_path: Path):
+    """a cover read from disk outlives older unread ones"""
+    store = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=200)
+    store.set("a", "a" * 100)
+    store.set("b", "b" * 100)
+    age(store, "a", 1_000)
+    age(store, "b", 2_000)
+
+    # a fresh store reads from disk only
+    reader = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=200)
+    assert reader.get("a") == "a" * 100
+    reader.set("c", "c" * 100)
+    assert reader._disk_path("a").exists()
+    assert not reader._disk_path("b").exists()
+
+
+def test_existing_files_count_against_budget(tmp_path: Path):
+    """a restart over budget trims the directory right away"""
+    store = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=1_000)
+    for key in "abcde":
+        store.set(key, key * 100)
+
+    shrunk = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=250)
+    assert shrunk.disk_bytes <= 250
+    assert len(list(tmp_path.glob("*.b64"))) == 2
+
+
+def test_oversized_entry_stays_off_disk(tmp_path: Path):
+    """a single cover bigger than the disk budget is kept in memory only"""
+    store = AlbumArtStore(max_bytes=1_000_000, disk_dir=tmp_path, disk_max_bytes=50)
+    store.set("a", "a" * 100)
+    assert store.get("a") == "a" * 100
+    assert store.disk_bytes == 0
+    assert not list(tmp_path.glob("*.b64"))
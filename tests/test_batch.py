@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.domain.models import ThemeStyle, ThemeType
+from tests.conftest import Upstream
+
+IDENTITY = {"accept-encoding": "identity"}
+
+
+def test_batch_fetches_track_and_cover_once(client: TestClient, upstream: Upstream):
+    """every variant of a batch shares one token, one now-playing call and one cover download"""
+    specs = [{"theme": theme.value, "style": style.value} for theme in ThemeType for style in ThemeStyle]
+    specs = specs[:get_settings().batch_max_widgets]
+    response = client.post("/batch", json={"widgets": specs})
+
+    assert response.status_code == 200
+    widgets = response.json()["widgets"]
+    # in request order, windows98 only comes in light
+    assert [widget["theme"] for widget in widgets] == [spec["theme"] for spec in specs]
+    assert upstream.calls == {"token": 1, "currently-playing": 1, "image": 1}
+
+
+def test_batch_widgets_match_single_renders(client: TestClient, upstream: Upstream):
+    """each variant is what its own widget endpoint serves, validator included"""
+    specs = [
+        {"theme": "default"},
+        {"theme": "retro", "mode": "native"},
+        {"theme": "ipod", "output": "html", "style": "dark"},
+    ]
+    widgets = client.post("/batch", json={"widgets": specs}).json()["widgets"]
+
+    singles = [
+        client.get("/github", params={"theme": "default"}, headers=IDENTITY),
+        client.get("/github", params={"theme": "retro", "mode": "native"}, headers=IDENTITY),
+        client.get("/", params={"theme": "ipod", "style": "dark"}, headers=IDENTITY),
+    ]
+    for widget, single in zip(widgets, singles):
+        assert widget["content"] == single.text
+        assert widget["etag"] == single.headers["etag"]
+        assert single.headers["content-type"].startswith(widget["media_type"])
+
+
+def test_batch_size_is_capped(client: TestClient, upstream: Upstream):
+    """oversized batches are refused before anything is fetched"""
+    specs = [{"theme": "default"}] * (get_settings().batch_max_widgets + 1)
+    response = client.post("/batch", json={"widgets": specs})
+
+    assert response.status_code == 422
+    assert upstream.calls["currently-playing"] == 0
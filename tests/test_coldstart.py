@@ -0,0 +1,40 @@
+import statistics
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from bench.coldstart import (
+    FIRST_REQUEST_BUDGET_MS, IMPORT_BUDGET_MS, cold_env, measure_first_request, measure_import
+)
+
+# fresh processes per measurement, the median counts like the command line check
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def env() -> Dict[str, str]:
+    """serverless environment for child interpreters started from the repository root"""
+    env = cold_env()
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parent.parent)
+    return env
+
+
+def test_import_within_budget(env: Dict[str, str]):
+    """importing the app in a fresh cold-start interpreter stays within budget"""
+    runs = [measure_import(env) for _ in range(RUNS)]
+    import_ms = statistics.median(total for total, _ in runs)
+
+    slowest = ", ".join(f"{name} {self_ms:.1f} ms" for name, self_ms in runs[0][1][:5])
+    assert 0 < import_ms <= IMPORT_BUDGET_MS, f"import took {import_ms:.1f} ms, slowest: {slowest}"
+
+
+def test_first_request_within_budget(env: Dict[str, str]):
+    """startup plus the first widget request in a fresh cold-start interpreter stays within budget"""
+    runs = [measure_first_request(env, "/github", "default") for _ in range(RUNS)]
+    first_ms = statistics.median(run["startup_ms"] + run["first_request_ms"] for run in runs)
+
+    assert all(run["status"] == 200 for run in runs)
+    assert first_ms <= FIRST_REQUEST_BUDGET_MS, (
+        f"first request took {first_ms:.1f} ms, stages: {runs[0]['server_timing']}"
+    )
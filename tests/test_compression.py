@@ -0,0 +1,78 @@
+from typing import Dict, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.models import ThemeType
+from app.render.compression import available_encodings
+from tests.conftest import Upstream
+
+# every theme must shrink by at least this fraction, vinyl's embedded art keeps it near 30%
+MIN_SAVINGS = 0.25
+
+THEMES = [theme.value for theme in ThemeType]
+
+
+@pytest.fixture(params=["gzip", "br"])
+def encoding(request: pytest.FixtureRequest) -> str:
+    """each content-coding this process can produce"""
+    if request.param not in available_encodings():
+        pytest.skip(f"{request.param} is not available")
+    return request.param
+
+
+def fetch(client: TestClient, accept_encoding: str, **params: str) -> Tuple[Dict[str, str], bytes]:
+    """headers and undecoded body of a github widget"""
+    headers = {"accept-encoding": accept_encoding}
+    with client.stream("GET", "/github", params=params, headers=headers) as response:
+        assert response.status_code == 200
+        return dict(response.headers), b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("theme", THEMES)
+def test_compressed_body_is_smaller(client: TestClient, upstream: Upstream, encoding: str, theme: str):
+    """every theme compresses by a real margin, not just a few header bytes"""
+    _, identity = fetch(client, "identity", theme=theme)
+    headers, compressed = fetch(client, encoding, theme=theme)
+
+    assert headers["content-encoding"] == encoding
+    assert len(compressed) <= len(identity) * (1 - MIN_SAVINGS)
+
+
+def test_negotiated_headers(client: TestClient, upstream: Upstream, encoding: str):
+    """the chosen coding is announced, varied on and folded into the validator"""
+    identity_headers, identity = fetch(client, "identity")
+    headers, _ = fetch(client, f"{encoding}, identity;q=0.5")
+
+    assert "content-encoding" not in identity_headers
+    assert identity_headers["vary"] == headers["vary"] == "Accept-Encoding"
+    assert headers["content-encoding"] == encoding
+    assert headers["etag"] == f'{identity_headers["etag"][:-1]}-{encoding}"'
+
+    # decoded bytes match the identity representation
+    decoded = client.get("/github", headers={"accept-encoding": encoding})
+    assert decoded.content == identity
+
+
+def test_suffixed_etag_revalidates(client: TestClient, upstream: Upstream, encoding: str):
+    """a client holding the compressed body gets a 304 for its own validator"""
+    headers, _ = fetch(client, encoding)
+    revalidated = client.get(
+        "/github", headers={"accept-encoding": encoding, "if-none-match": headers["etag"]}
+    )
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == headers["etag"]
+    assert "content-encoding" not in revalidated.headers
+    assert revalidated.content == b""
+
+
+def test_identity_etag_does_not_match_compressed(client: TestClient, upstream: Upstream, encoding: str):
+    """validators of different codings are not interchangeable"""
+    identity_headers, _ = fetch(client, "identity")
+    response = client.get(
+        "/github", headers={"accept-encoding": encoding, "if-none-match": identity_headers["etag"]}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == encoding
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+from app.api.http import get_http_pool
+from app.api.limits import get_upstream_guard
+from app.api.poller import NowPlayingPoller
+from app.api.tenants import TenantRegistry, UserCredentials, UserStore
+from app.config import get_settings
+from app.domain.models import Track
+from app.main import track_event, track_events
+from app.utils import timing
+from app.utils.base64 import get_encoder
+from tests.conftest import Upstream
+
+
+class RecordingClient:
+    """api client stand-in noting the stage timings each fetch would record into"""
+
+    def __init__(self):
+        """initialize with no fetches seen"""
+        self.timings: List[Optional[dict]] = []
+
+    async def get_current_track(self) -> Track:
+        """return a fixed track"""
+        self.timings.append(timing._current.get())
+        return {"id": "fake", "name": "Fake", "artist": "Artist", "album_images": []}
+
+
+def test_watch_loop_does_not_record_into_the_starting_request():
+    """polls made for watchers never land in the stage timings of the request that started them"""
+    client = RecordingClient()
+    poller = NowPlayingPoller(client, 0)
+
+    async def watch():
+        # stands in for the middleware of the events request
+        timing._current.set({})
+        async with poller.watching(0.01):
+            await poller.wait_for_change(0, 1.0)
+            await asyncio.sleep(0.05)
+
+    asyncio.run(watch())
+    assert len(client.timings) > 1
+    assert client.timings == [None] * len(client.timings)
+
+
+async def collect(events: AsyncIterator[str]) -> List[str]:
+    """drain an event stream"""
+    return [event async for event in events]
+
+
+def test_evicted_tenant_stops_polling(tmp_path: Path, upstream: Upstream):
+    """a poller dropped from the tenant cache cancels its watch loop and ends its event streams"""
+    store = UserStore(str(tmp_path / "users.db"))
+    store.put(UserCredentials("first", "first-token"))
+    store.put(UserCredentials("second", "second-token"))
+
+    async def evict():
+        tenants = TenantRegistry(store, get_settings(), get_http_pool(), get_encoder(), get_upstream_guard(),
+                                 maxsize=1, snapshot_ttl=60)
+        first = tenants.get_poller("first")
+        events = track_events(first, 0.01)
+        assert (await events.__anext__()).startswith("event: track")
+        watch_task = first._watch_task
+
+        # dependencies resolve in a worker thread
+        await asyncio.to_thread(tenants.get_poller, "second")
+        remaining = await asyncio.wait_for(collect(events), 2.0)
+        await asyncio.sleep(0)
+        return first, watch_task, remaining
+
+    first, watch_task, remaining = asyncio.run(evict())
+    assert first.closed
+    assert watch_task.cancelled()
+    assert remaining == []
+
+
+def test_track_event_without_cover_sends_the_placeholder():
+    """a track without art replaces the previous cover instead of leaving it in place"""
+    event = track_event({"id": "local", "name": "Local File", "artist": "Someone", "album_images": []})
+    payload = json.loads(event.split("data: ", 1)[1])
+
+    assert payload["art"] == f"data:image/svg+xml;base64,{get_encoder().get_default_image()}"
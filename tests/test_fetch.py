@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from bench.fake_spotify import cover_image, track_item
+
+from app.api.http import get_http_pool
+from app.api.spotify import get_spotify_client
+from app.domain.models import Track
+from tests.conftest import reset_providers
+
+
+class Scripted:
+    """fake spotify with per-route delays, logging when each request starts and ends"""
+
+    def __init__(self, playing: bool = True, delays: Optional[Dict[str, float]] = None, slow_images: int = 0):
+        """initialize with playback state, route delays and cover attempts that stall"""
+        self.playing = playing
+        self.delays = delays or {}
+        self.slow_images = slow_images
+        self.log: List[Tuple[str, str]] = []
+        self.calls: Counter = Counter()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """answer one outbound request after its route's delay"""
+        path = request.url.path
+        route = path.rsplit("/", 1)[1] if "/me/player/" in path else "image" if path.startswith("/image/") else "token"
+        self.calls[route] += 1
+        self.log.append(("start", route))
+        delay = self.delays.get(route, 0.0)
+        if route == "image" and self.slow_images > 0:
+            self.slow_images -= 1
+            delay = 1.0
+        await asyncio.sleep(delay)
+        self.log.append(("end", route))
+
+        if route == "token":
+            return httpx.Response(200, json={"access_token": "test-token", "expires_in": 3600})
+        if route == "currently-playing":
+            if not self.playing:
+                return httpx.Response(204)
+            return httpx.Response(200, json={"is_playing": True, "item": track_item(1)})
+        if route == "recently-played":
+            items = [
+                {"played_at": f"2024-01-01T00:00:{i:02d}Z", "track": track_item(10 + i)}
+                for i in (1, 2, 0)
+            ]
+            return httpx.Response(200, json={"items": items})
+        size = int(path.rsplit("-", 1)[1])
+        return httpx.Response(200, content=cover_image(1, size), headers={"content-type": "image/jpeg"})
+
+    def started_before_end(self, started: str, ended: str) -> bool:
+        """whether a request to one route started before another route's request ended"""
+        return self.log.index(("start", started)) < self.log.index(("end", ended))
+
+
+@pytest.fixture
+def fetch(monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[[Scripted], Track]]:
+    """fetch the current track against a scripted upstream with the parallel strategy"""
+    monkeypatch.setenv("FETCH_STRATEGY", "parallel")
+    monkeypatch.setenv("IMAGE_HEDGE_DELAY", "0.05")
+
+    def run(fake: Scripted) -> Track:
+        reset_providers()
+        get_http_pool().transport = httpx.MockTransport(fake.handle)
+        return asyncio.run(get_spotify_client().get_current_track())
+
+    yield run
+    reset_providers()
+
+
+def test_parallel_requests_overlap_and_current_wins(fetch: Callable[[Scripted], Track]):
+    """both endpoints are asked at once, a playing track still takes precedence"""
+    fake = Scripted(delays={"currently-playing": 0.05})
+    track = fetch(fake)
+
+    assert fake.started_before_end("recently-played", "currently-playing")
+    assert track["id"] == "fake000001"
+
+
+def test_idle_player_serves_latest_recent_track_with_early_cover(fetch: Callable[[Scripted], Track]):
+    """while current is still answering, the recent track's cover is already downloading"""
+    fake = Scripted(playing=False, delays={"currently-playing": 0.05})
+    track = fetch(fake)
+
+    assert track["id"] == "fake000012"
+    assert fake.started_before_end("image", "currently-playing")
+    assert fake.calls["image"] == 1
+
+
+def test_slow_cover_download_is_hedged(fetch: Callable[[Scripted], Track]):
+    """a stalled cover attempt is raced by a second one instead of waited out"""
+    fake = Scripted(slow_images=1)
+    start = time.perf_counter()
+    track = fetch(fake)
+
+    assert time.perf_counter() - start < 0.5
+    assert fake.calls["image"] == 2
+    assert track["album_image"] is not None
+
+
+def test_serial_strategy_skips_recent_while_playing(fetch: Callable[[Scripted], Track],
+                                                    monkeypatch: pytest.MonkeyPatch):
+    """the default strategy only asks for recent tracks when nothing is playing"""
+    monkeypatch.setenv("FETCH_STRATEGY", "serial")
+    fake = Scripted()
+    track = fetch(fake)
+
+    assert track["id"] == "fake000001"
+    assert fake.calls["recently-played"] == 0
@@ -0,0 +1,52 @@
+import base64
+import io
+import re
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.render.text import get_width_table
+from app.utils.fonts import FONTS_DIR
+from app.utils.pixelfont import OUTPUT_NAME, SOURCE_NAME, build_pixel_font
+from tests.conftest import Upstream
+
+TTFont = pytest.importorskip("fontTools.ttLib").TTFont
+
+
+def embedded_font(body: str) -> "TTFont":
+    """first base64 font embedded in a widget"""
+    match = re.search(r"src:url\(data:font/(?:woff2|woff);base64,([A-Za-z0-9+/=]+)\)", body)
+    assert match, "no embedded font"
+    return TTFont(io.BytesIO(base64.b64decode(match.group(1))))
+
+
+@pytest.mark.parametrize("mode", ["foreign", "native"])
+def test_retro_embeds_the_pixel_subset(client: TestClient, upstream: Upstream, mode: str):
+    """retro draws in the bundled pixel face without asking for remote fonts"""
+    response = client.get("/github", params={"theme": "retro", "mode": mode})
+    assert response.status_code == 200
+    assert "@import" not in response.text
+    assert "font-family:'Widget Pixel'" in response.text
+
+    # track text is drawn in capitals, so the subset carries those glyphs
+    cmap = embedded_font(response.text).getBestCmap()
+    for char in "BENCHMARK TRACK & FRIENDS ARTIST NOW PLAYING●":
+        assert ord(char) in cmap, char
+
+
+def test_pixel_width_table_comes_from_the_font_file():
+    """retro text is measured with the bundled file's advances"""
+    font = TTFont(str(FONTS_DIR / OUTPUT_NAME))
+    units = font["head"].unitsPerEm
+    table = get_width_table("retro-pixel")
+    for char in "Mi ●":
+        glyph = font.getBestCmap()[ord(char)]
+        assert table.advance(char) == font["hmtx"][glyph][0] / units
+
+
+def test_bundled_pixel_font_is_current(tmp_path: Path):
+    """the shipped pixel font matches a rebuild from dejavu sans"""
+    output = tmp_path / OUTPUT_NAME
+    build_pixel_font(FONTS_DIR / SOURCE_NAME, output)
+    assert output.read_bytes() == (FONTS_DIR / OUTPUT_NAME).read_bytes()
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.limits import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable, get_upstream_guard
+from app.config import Settings
+from app.domain.models import ThemeType
+from tests.conftest import Upstream
+
+
+def open_guard(rate: float = 1.0, burst: int = 2) -> UpstreamGuard:
+    """guard whose breaker has just opened"""
+    guard = UpstreamGuard(TokenBucket(rate, burst), CircuitBreaker(failure_threshold=1, reset_timeout=30))
+    guard.record_error()
+    return guard
+
+
+def test_open_breaker_does_not_spend_tokens():
+    """rejections while the circuit is open leave the bucket full"""
+    guard = open_guard()
+    for _ in range(5):
+        with pytest.raises(UpstreamUnavailable) as raised:
+            guard.check()
+        assert raised.value.reason == "circuit-open"
+
+    assert guard.counts["circuit_rejected"] == 5
+    assert guard.counts["throttled"] == 0
+    # the whole burst is still available once the breaker closes
+    guard.breaker.record_success()
+    guard.check()
+    guard.check()
+    assert guard.counts["allowed"] == 2
+
+
+def test_throttled_trial_releases_half_open_slot():
+    """a trial call refused by the bucket leaves the slot for the next caller"""
+    guard = open_guard(burst=1)
+    guard.bucket._tokens = 0.0
+    guard.bucket._updated = time.monotonic()
+    guard.breaker._opened_at -= guard.breaker.reset_timeout
+
+    with pytest.raises(UpstreamUnavailable) as raised:
+        guard.check()
+    assert raised.value.reason == "throttled"
+    assert guard.counts["throttled"] == 1
+
+    guard.bucket._tokens = 1.0
+    guard.check()
+    assert guard.counts["allowed"] == 1
+
+
+@pytest.mark.parametrize("env, rate", [
+    ({"POLL_INTERVAL": "0"}, 0.0),
+    ({"POLL_INTERVAL": "10"}, 5.0),
+    ({"POLL_INTERVAL": "0", "SPOTIFY_RATE_LIMIT": "2"}, 2.0),
+])
+def test_rate_limit_defaults_to_the_poller(monkeypatch: pytest.MonkeyPatch, env, rate):
+    """per-request fetching is not throttled unless a limit is set"""
+    monkeypatch.delenv("SPOTIFY_RATE_LIMIT", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert Settings().spotify_rate_limit == rate
+
+
+def test_page_of_widgets_is_not_throttled(client: TestClient, upstream: Upstream):
+    """a readme with many widgets is served live under the default configuration"""
+    paths = ("/", "/github")
+    styles = ("light", "dark")
+    for path in paths:
+        for theme in ThemeType:
+            for style in styles:
+                response = client.get(path, params={"theme": theme.value, "style": style})
+                assert response.status_code == 200
+
+    stats = get_upstream_guard().stats()
+    assert stats.get("throttled", 0) == 0
+    assert upstream.calls["currently-playing"] == len(paths) * len(ThemeType) * len(styles)
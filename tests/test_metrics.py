@@ -0,0 +1,45 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import cache_stats
+from app.themes import ThemeRegistry
+from tests.conftest import Upstream
+
+REQUESTS = 3
+
+
+@pytest.fixture
+def cold_themes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """start from empty theme caches with zeroed counters"""
+    monkeypatch.setattr(ThemeRegistry, "_base", {})
+    monkeypatch.setattr(ThemeRegistry, "_variants", None)
+    monkeypatch.setattr(ThemeRegistry, "base_hits", 0)
+    monkeypatch.setattr(ThemeRegistry, "base_misses", 0)
+
+
+def test_cache_counts_after_repeated_requests(client: TestClient, upstream: Upstream, cold_themes: None):
+    """each lookup is counted once, whichever path makes it"""
+    for _ in range(REQUESTS):
+        assert client.get("/github", params={"theme": "retro"}).status_code == 200
+    stats = {name: (hits, misses, entries) for name, hits, misses, entries in cache_stats()}
+
+    # one token lookup per fetch from spotify, only the first refreshes
+    assert upstream.calls["currently-playing"] == REQUESTS
+    assert upstream.calls["token"] == 1
+    assert stats["token"] == (REQUESTS - 1, 1, 1)
+
+    # the etag digest builds light and dark, the template and context of the first render reuse them
+    assert stats["themes"] == (2, 2, 2)
+    assert stats["render"] == (REQUESTS - 1, 1, 1)
+
+
+def test_metrics_report_base_theme_lookups(client: TestClient, upstream: Upstream, cold_themes: None):
+    """base theme lookups are exported next to the colored variants"""
+    client.get("/github")
+    # colored variants still resolve their base first
+    client.get("/github", params={"color": "ff0000"})
+    metrics = client.get("/metrics").text
+
+    assert 'widget_cache_hits_total{cache="themes"} 3' in metrics
+    assert 'widget_cache_misses_total{cache="themes"} 2' in metrics
+    assert 'widget_cache_misses_total{cache="theme_variants"} 1' in metrics
@@ -0,0 +1,34 @@
+from xml.dom import minidom
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.render.text import ELLIPSIS, get_width_table
+from tests.conftest import Upstream
+
+NATIVE_THEMES = ["default", "retro", "windows98"]
+
+
+@pytest.mark.parametrize("theme", NATIVE_THEMES)
+def test_native_svg_loads_nothing_remote(client: TestClient, upstream: Upstream, theme: str):
+    """github serves images without remote fonts, so native output must not ask for any"""
+    response = client.get("/github", params={"theme": theme, "mode": "native"})
+    assert response.status_code == 200
+    assert "@import" not in response.text
+    assert "fonts.googleapis.com" not in response.text
+    minidom.parseString(response.content)
+
+
+def test_windows98_fields_fit_the_widest_system_monospace_face(client: TestClient, upstream: Upstream):
+    """the track title is cut to the 180px field at the widest advance of the font stack"""
+    response = client.get("/github", params={"theme": "windows98", "mode": "native"})
+    title = next(
+        node.firstChild.data
+        for node in minidom.parseString(response.content).getElementsByTagName("text")
+        if node.getAttribute("x") == "196" and node.getAttribute("y") == "91"
+    )
+
+    assert title.endswith(ELLIPSIS)
+    assert get_width_table("system-mono").width(title, 12) <= 180
+    # dejavu sans mono, the widest face in the stack
+    assert len(title) * 0.602 * 12 <= 180
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.http import get_http_pool
+from app.api.poller import NowPlayingPoller
+from app.domain.models import Track
+from tests.conftest import Upstream, reset_providers
+
+
+class CountingClient:
+    """api client stand-in counting fetches"""
+
+    def __init__(self):
+        """initialize with no fetches made"""
+        self.fetches = 0
+
+    async def get_current_track(self) -> Track:
+        """return a track after a short delay, so concurrent callers overlap"""
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return {"id": f"fake{self.fetches}", "name": "Fake", "artist": "Artist", "album_images": []}
+
+
+def test_fresh_snapshot_is_served_from_memory():
+    """concurrent first requests share one fetch, later ones read the snapshot"""
+    client = CountingClient()
+    poller = NowPlayingPoller(client, 60)
+
+    async def requests():
+        first = await asyncio.gather(*(poller.get_current_track() for _ in range(5)))
+        return first + [await poller.get_current_track() for _ in range(5)]
+
+    tracks = asyncio.run(requests())
+    assert client.fetches == 1
+    assert {track["id"] for track in tracks} == {"fake1"}
+
+
+def test_stale_snapshot_is_refreshed_inline():
+    """a snapshot the loop stopped refreshing is replaced on the next request"""
+    client = CountingClient()
+    poller = NowPlayingPoller(client, 60, max_age=0.05)
+
+    async def requests():
+        first = await poller.get_current_track()
+        await asyncio.sleep(0.1)
+        return first, await poller.get_current_track()
+
+    first, second = asyncio.run(requests())
+    assert (first["id"], second["id"]) == ("fake1", "fake2")
+
+
+def test_disabled_poller_fetches_per_request():
+    """without an interval every request goes to spotify"""
+    client = CountingClient()
+    poller = NowPlayingPoller(client, 0)
+
+    async def requests():
+        for _ in range(3):
+            await poller.get_current_track()
+
+    asyncio.run(requests())
+    assert client.fetches == 3
+    assert poller.snapshot is None
+
+
+@pytest.fixture
+def polling(monkeypatch: pytest.MonkeyPatch) -> Iterator[Upstream]:
+    """fake spotify with the background poller on"""
+    monkeypatch.setenv("POLL_INTERVAL", "60")
+    reset_providers()
+    fake = Upstream()
+    get_http_pool().transport = httpx.MockTransport(fake.handle)
+    yield fake
+    reset_providers()
+
+
+def test_upstream_load_does_not_grow_with_traffic(polling: Upstream):
+    """every endpoint reads the polled snapshot, cover included"""
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/github").status_code == 200
+        calls = dict(polling.calls)
+        for path in ["/", "/github", "/link"] * 5:
+            assert client.get(path, params={"theme": "retro"}).status_code == 200
+
+    assert dict(polling.calls) == calls
+    assert calls["currently-playing"] <= 2
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.http import get_http_pool
+from app.themes import ThemeRegistry
+from app.themes.default import DefaultTheme
+from tests.conftest import Upstream, reset_providers
+
+
+def test_placeholder_art_is_not_cached(client: TestClient, upstream: Upstream):
+    """a render built while the cover download fails is not reused once the cover loads"""
+    # one failure for the track fetch's default size, one for the widget's own size
+    upstream.image_failures = 2
+    failed = client.get("/github", headers={"accept-encoding": "identity"})
+    assert failed.status_code == 200
+    assert "data:image/jpeg" not in failed.text
+    assert "etag" not in failed.headers
+    assert failed.headers["cache-control"] == "no-store"
+
+    recovered = client.get("/github", headers={"accept-encoding": "identity"})
+    assert recovered.status_code == 200
+    assert "data:image/jpeg" in recovered.text
+    assert recovered.headers["etag"]
+
+    revalidated = client.get(
+        "/github", headers={"accept-encoding": "identity", "if-none-match": recovered.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_batch_reports_no_etag_for_placeholder_art(client: TestClient, upstream: Upstream):
+    """batch variants rendered from placeholder art carry no validator"""
+    upstream.image_failures = 10
+    response = client.post("/batch", json={"widgets": [{"theme": "default"}]})
+    assert response.status_code == 200
+    assert response.json()["widgets"][0]["etag"] is None
+
+
+def deploy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """simulate a restart, rebuilding providers and theme instances"""
+    monkeypatch.setattr(ThemeRegistry, "_base", {})
+    ThemeRegistry.variants().clear()
+    reset_providers()
+    get_http_pool().transport = httpx.MockTransport(Upstream().handle)
+
+
+def test_theme_color_change_invalidates_etag(client: TestClient, upstream: Upstream,
+                                              monkeypatch: pytest.MonkeyPatch):
+    """a deploy that changes a theme's colors does not revalidate stale bodies"""
+    before = client.get("/github", headers={"accept-encoding": "identity"})
+
+    build_css = DefaultTheme.build_css
+
+    def recolored(self):
+        css = build_css(self)
+        css["title_color"] = "#123456"
+        return css
+
+    monkeypatch.setattr(DefaultTheme, "build_css", recolored)
+    deploy(monkeypatch)
+    after = client.get(
+        "/github", headers={"accept-encoding": "identity", "if-none-match": before.headers["etag"]}
+    )
+
+    assert after.status_code == 200
+    assert "#123456" in after.text
+    assert after.headers["etag"] != before.headers["etag"]
+
+
+def test_art_settings_change_invalidates_etag(client: TestClient, upstream: Upstream,
+                                              monkeypatch: pytest.MonkeyPatch):
+    """album art encoder settings are part of the validator"""
+    before = client.get("/github", headers={"accept-encoding": "identity"}).headers["etag"]
+
+    monkeypatch.setenv("ART_QUALITY", "40")
+    deploy(monkeypatch)
+    after = client.get("/github", headers={"accept-encoding": "identity"}).headers["etag"]
+
+    assert after != before
@@ -0,0 +1,34 @@
+import shutil
+from pathlib import Path
+
+from app.config import STATIC_PATH
+from app.utils.assets import COMPILED_DIR, compile_assets
+from app.utils.static import STATIC_URL, asset_path, asset_url, file_digest
+
+
+def copy_static(tmp_path: Path) -> Path:
+    """static directory with a freshly compiled logo"""
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    shutil.copy(STATIC_PATH / "spotify.svg", static_dir / "spotify.svg")
+    compile_assets(static_dir, ["spotify.svg"])
+    return static_dir
+
+
+def test_current_compiled_asset_is_preferred(tmp_path: Path):
+    """compiled output built from the current source gets the hashed url"""
+    static_dir = copy_static(tmp_path)
+
+    assert asset_path("spotify.svg", static_dir) == f"{COMPILED_DIR}/spotify.svg"
+    digest = file_digest(static_dir / COMPILED_DIR / "spotify.svg")
+    assert asset_url("spotify.svg", static_dir) == f"{STATIC_URL}/{COMPILED_DIR}/spotify.{digest}.svg"
+
+
+def test_stale_compiled_asset_is_not_served(tmp_path: Path):
+    """a source changed after compiling is served as is, hashed by its own content"""
+    static_dir = copy_static(tmp_path)
+    source = static_dir / "spotify.svg"
+    source.write_text(source.read_text().replace("</svg>", "<rect width=\"1\" height=\"1\"/></svg>"))
+
+    assert asset_path("spotify.svg", static_dir) == "spotify.svg"
+    assert asset_url("spotify.svg", static_dir) == f"{STATIC_URL}/spotify.{file_digest(source)}.svg"
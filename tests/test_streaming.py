@@ -0,0 +1,35 @@
+from xml.dom import minidom
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.models import ThemeType
+from tests.conftest import Upstream
+from tests.test_native import NATIVE_THEMES
+
+IDENTITY = {"accept-encoding": "identity"}
+
+VARIANTS = [{"theme": theme.value} for theme in ThemeType] + [
+    {"theme": theme, "mode": "native"} for theme in NATIVE_THEMES
+]
+
+
+@pytest.mark.parametrize("params", VARIANTS, ids=lambda params: "-".join(params.values()))
+def test_streamed_body_matches_cached_body(client: TestClient, upstream: Upstream, params: dict):
+    """the first render is streamed in chunks and is byte for byte what the cache serves later"""
+    streamed = client.get("/github", params=params, headers=IDENTITY)
+    cached = client.get("/github", params=params, headers=IDENTITY)
+
+    assert streamed.status_code == cached.status_code == 200
+    assert "content-length" not in streamed.headers
+    assert cached.headers["content-length"] == str(len(cached.content))
+    assert streamed.content == cached.content
+    minidom.parseString(streamed.content)
+
+
+def test_track_fields_are_escaped_by_the_templates(client: TestClient, upstream: Upstream):
+    """ampersands in track names arrive as xml entities in the streamed document"""
+    body = client.get("/github", headers=IDENTITY).text
+
+    assert "Benchmark Track 1 &amp; Friends" in body
+    assert "Track 1 & Friends" not in body
@@ -0,0 +1,28 @@
+from app.config import TEMPLATES_PATH
+from app.render.templates import minify_template
+
+
+def test_live_script_survives_minification():
+    """the live script is copied byte for byte, whitespace and all"""
+    source = (TEMPLATES_PATH / "live.html").read_text()
+    script = source[source.index("<script>"):source.index("</script>") + len("</script>")]
+
+    assert script in minify_template(source)
+
+
+def test_quoted_css_values_survive_minification():
+    """css strings keep their inner whitespace while the rules around them are collapsed"""
+    source = """<style>
+        .title::after {
+            content: "  now  playing  ";
+            font-family: 'Widget  {{ face }}', sans-serif; /* it's a pixel face */
+        }
+    </style>
+    <pre>  one
+  two</pre>"""
+
+    assert minify_template(source) == (
+        """<style> .title::after{content: "  now  playing  ";font-family: 'Widget  {{ face }}', sans-serif;}"""
+        """</style> <pre>  one\n  two</pre>"""
+    )
+
@@ -0,0 +1,38 @@
+from typing import Dict, Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.http import get_http_pool
+from tests.conftest import Upstream, reset_providers
+
+
+@pytest.fixture
+def timeouts(monkeypatch: pytest.MonkeyPatch) -> Iterator[Dict[str, float]]:
+    """read timeout of each kind of outbound request, with both timeouts configured"""
+    monkeypatch.setenv("SPOTIFY_TIMEOUT", "1.5")
+    monkeypatch.setenv("IMAGE_TIMEOUT", "0.5")
+    reset_providers()
+    fake = Upstream()
+    seen: Dict[str, float] = {}
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        kind = "token" if path.endswith("/api/token") else "image" if path.startswith("/image/") else "api"
+        seen[kind] = request.extensions["timeout"]["read"]
+        return fake.handle(request)
+
+    get_http_pool().transport = httpx.MockTransport(handle)
+    yield seen
+    reset_providers()
+
+
+def test_outbound_timeouts_come_from_settings(timeouts: Dict[str, float]):
+    """token refreshes, api calls and cover downloads use the configured timeouts"""
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/github").status_code == 200
+
+    assert timeouts == {"token": 1.5, "api": 1.5, "image": 0.5}
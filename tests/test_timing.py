@@ -0,0 +1,54 @@
+import logging
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import Upstream
+
+
+def stages(header: str) -> Dict[str, float]:
+    """stage durations from a server-timing header"""
+    parsed = {}
+    for metric in header.split(","):
+        name, _, duration = metric.strip().partition(";dur=")
+        parsed[name] = float(duration)
+    return parsed
+
+
+def test_cache_miss_reports_render_and_compress(client: TestClient, upstream: Upstream):
+    """a streamed render still carries its template and compression stages in the header"""
+    response = client.get("/github", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+    timings = stages(response.headers["server-timing"])
+    assert {"token", "current-track", "image-fetch", "theme-transform", "template-render", "compress", "total"} <= set(timings)
+
+
+def test_identity_cache_miss_has_no_compress_stage(client: TestClient, upstream: Upstream):
+    """nothing is compressed for clients that do not accept a coding"""
+    response = client.get("/github", headers={"accept-encoding": "identity"})
+
+    timings = stages(response.headers["server-timing"])
+    assert "template-render" in timings
+    assert "compress" not in timings
+
+
+def test_cache_hit_skips_rendering(client: TestClient, upstream: Upstream):
+    """a cached render reports neither rendering nor compression"""
+    client.get("/github", headers={"accept-encoding": "gzip"})
+    response = client.get("/github", headers={"accept-encoding": "gzip"})
+
+    timings = stages(response.headers["server-timing"])
+    assert "template-render" not in timings
+    assert "compress" not in timings
+
+
+def test_access_log_has_full_stream_stages(client: TestClient, upstream: Upstream,
+                                           caplog: pytest.LogCaptureFixture):
+    """stages of chunks sent after the headers still reach the access log"""
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        client.get("/github", params={"theme": "vinyl"}, headers={"accept-encoding": "br"})
+
+    record = next(record for record in caplog.records if record.name == "app.access")
+    assert {"template-render", "compress"} <= set(record.stages)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api.http import HttpClientPool
+from app.api.spotify import SpotifyAuthClient
+from app.config import get_settings
+from tests.conftest import Upstream
+
+
+class Accounts:
+    """slow token endpoint counting refreshes"""
+
+    def __init__(self, expires_in: int = 3600, rotated: Optional[str] = None):
+        """initialize with the token lifetime and an optional rotated refresh token"""
+        self.expires_in = expires_in
+        self.rotated = rotated
+        self.refreshes = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """answer a refresh after a delay, so concurrent callers overlap"""
+        self.refreshes += 1
+        await asyncio.sleep(0.01)
+        payload = {"access_token": f"token-{self.refreshes}", "expires_in": self.expires_in}
+        if self.rotated:
+            payload["refresh_token"] = self.rotated
+        return httpx.Response(200, json=payload)
+
+
+def auth_client(accounts: Accounts, token_cache_path: str = "") -> SpotifyAuthClient:
+    """token manager against the fake accounts host"""
+    settings = get_settings().model_copy(update={"token_cache_path": token_cache_path})
+    return SpotifyAuthClient(settings, HttpClientPool(settings, httpx.MockTransport(accounts.handle)))
+
+
+def test_concurrent_requests_share_one_refresh():
+    """callers arriving during a refresh wait for it instead of starting their own"""
+    accounts = Accounts()
+    client = auth_client(accounts)
+
+    async def burst():
+        return await asyncio.gather(*(client.get_token() for _ in range(10)))
+
+    tokens = asyncio.run(burst())
+    assert tokens == ["token-1"] * 10
+    assert accounts.refreshes == 1
+    assert (client.hits, client.misses) == (9, 1)
+
+
+def test_token_is_refreshed_before_expiry():
+    """a token inside the refresh margin is replaced, a fresh one is reused"""
+    accounts = Accounts()
+    client = auth_client(accounts)
+
+    async def fetch_twice(expires_at: float):
+        first = await client.get_token()
+        client._expires_at = expires_at
+        return first, await client.get_token()
+
+    assert asyncio.run(fetch_twice(time.time() + 3600)) == ("token-1", "token-1")
+    # expires before the refresh margin runs out
+    margin = get_settings().token_refresh_margin
+    assert asyncio.run(fetch_twice(time.time() + margin / 2)) == ("token-1", "token-2")
+    assert accounts.refreshes == 2
+
+
+def test_rotated_token_survives_a_restart(tmp_path: Path):
+    """the access token and rotated refresh token are persisted for the next process"""
+    path = str(tmp_path / "token.json")
+    accounts = Accounts(rotated="rotated-refresh-token")
+    assert asyncio.run(auth_client(accounts, path).get_token()) == "token-1"
+
+    saved = json.loads(Path(path).read_text())
+    assert saved["refresh_token"] == "rotated-refresh-token"
+
+    # a cold start reuses the saved token without calling the accounts host
+    restarted = auth_client(accounts, path)
+    assert asyncio.run(restarted.get_token()) == "token-1"
+    assert accounts.refreshes == 1
+
+
+def test_rejected_token_is_refreshed_once(client: TestClient, upstream: Upstream):
+    """a 401 from the api drops the cached token and retries with a new one"""
+    upstream.rejections = 1
+    response = client.get("/github")
+
+    assert response.status_code == 200
+    assert "Benchmark Track 1" in response.text
+    assert upstream.calls["currently-playing"] == 2
+    assert upstream.calls["token"] == 2
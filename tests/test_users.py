@@ -0,0 +1,23 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import Upstream
+
+
+@pytest.mark.parametrize("path", ["/u/someone", "/u/someone/github", "/u/someone/link", "/github?user=someone"])
+def test_user_urls_are_not_found_without_multi_user(client: TestClient, upstream: Upstream, path: str):
+    """user-scoped urls do not fall back to the configured account"""
+    response = client.get(path)
+    assert response.status_code == 404
+    assert upstream.calls["currently-playing"] == 0
+
+
+def test_batch_for_user_is_not_found_without_multi_user(client: TestClient, upstream: Upstream):
+    """batches for a user key are rejected the same way"""
+    response = client.post("/u/someone/batch", json={"widgets": [{"theme": "default"}]})
+    assert response.status_code == 404
+
+
+def test_plain_urls_serve_the_configured_account(client: TestClient, upstream: Upstream):
+    """urls without a user key are unaffected"""
+    assert client.get("/link").status_code == 200